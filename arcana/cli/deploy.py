@@ -1,23 +1,25 @@
 import logging
+import os
 import sys
+import typing as ty
 import shutil
 from pathlib import Path
 import re
 import json
 from collections import defaultdict
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import shlex
 from traceback import format_exc
 import tempfile
 import yaml
 import click
-import docker
-import docker.errors
-import xnat as xnatpy
-from arcana.core.cli import cli
+from arcana.core.cli import cli, CsvList
 from arcana.core.pipeline import Input as PipelineInput, Output as PipelineOutput
 from arcana.core.utils import resolve_class, parse_value, show_workflow_errors
 from arcana.core.deploy.utils import (
     load_yaml_spec,
+    load_all_specs,
     walk_spec_paths,
     DOCKER_HUB,
     extract_file_from_docker_image,
@@ -25,16 +27,15 @@ from arcana.core.deploy.utils import (
 )
 from arcana.core.deploy.docs import create_doc
 from arcana.core.deploy.build import SPEC_PATH as spec_path_in_docker
-from arcana.core.utils import package_from_module, pydra_asdict
+from arcana.core.utils import package_from_module, pydra_collect_modules
 from arcana.core.data.row import DataRow
-from arcana.deploy.medimage.xnat import build_xnat_cs_image, create_metapackage
-from arcana.core.data.set import Dataset
-from arcana.core.data.store import DataStore
 from arcana.exceptions import ArcanaBuildError, ArcanaUsageError
 
 
 logger = logging.getLogger("arcana")
 
+DOCS_MAX_WORKERS = 16
+
 
 @cli.group()
 def deploy():
@@ -102,8 +103,8 @@ DOCKER_ORG is the Docker organisation the images should belong to"""
 )
 @click.option(
     "--install-extras",
-    type=str,
-    default=None,
+    type=CsvList(),
+    default=(),
     help=(
         "Install extras to use when installing Arcana inside the "
         "container image. Typically only used in tests to provide "
@@ -153,6 +154,16 @@ DOCKER_ORG is the Docker organisation the images should belong to"""
     default=False,
     help=("push built images to registry"),
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=1,
+    help=(
+        "Number of images to build in parallel. Each build is run in a separate "
+        "process and is typically limited by the Docker daemon, so keep it modest"
+    ),
+)
 def build(
     spec_path,
     docker_org,
@@ -170,23 +181,18 @@ def build(
     license_dir,
     check_registry,
     push,
+    jobs,
 ):
 
-    if isinstance(spec_path, bytes):  # FIXME: This shouldn't be necessary
-        spec_path = Path(spec_path.decode("utf-8"))
-    if isinstance(build_dir, bytes):  # FIXME: This shouldn't be necessary
-        build_dir = Path(build_dir.decode("utf-8"))
-    if isinstance(license_dir, bytes):  # FIXME: This shouldn't be necessary
-        license_dir = Path(license_dir.decode("utf-8"))
+    spec_path = _as_path(spec_path)
+    build_dir = _as_path(build_dir)
+    license_dir = _as_path(license_dir)
 
-    if install_extras:
-        install_extras = install_extras.split(",")
-    else:
-        install_extras = []
-
-    dc = docker.from_env()
+    # Heavy dependencies are imported within the commands that need them to
+    # keep the start-up time of the CLI down
+    from arcana.deploy.medimage.xnat import create_metapackage
 
-    logging.basicConfig(filename=logfile, level=getattr(logging, loglevel.upper()))
+    logging.basicConfig(filename=logfile, level=_log_level(loglevel))
 
     temp_dir = tempfile.mkdtemp()
 
@@ -203,115 +209,50 @@ def build(
     else:
         docker_org_fullpath = docker_org
 
-    errors = False
-    for spath in walk_spec_paths(spec_path):
-
-        logging.info("Building '%s' image", spath)
-        spec = load_yaml_spec(spath, base_dir=spec_path)
-
-        # Make image tag
-        pkg_name = spath.stem.lower()
-        image_name = ".".join(spath.relative_to(spec_path).parent.parts + (pkg_name,))
-
-        image_name = f"{docker_org_fullpath}/{image_name}"
-
-        image_version = str(spec.pop("pkg_version"))
-        if "wrapper_version" in spec:
-            image_version += f"-{spec.pop('wrapper_version')}"
-
-        image_tag = f"{image_name}:{image_version}"
+    build_image = partial(
+        _build_image,
+        spec_path=spec_path,
+        docker_org_fullpath=docker_org_fullpath,
+        docker_registry=docker_registry,
+        build_dir=build_dir,
+        use_local_packages=use_local_packages,
+        install_extras=list(install_extras),
+        use_test_config=use_test_config,
+        raise_errors=raise_errors,
+        generate_only=generate_only,
+        license_dir=license_dir,
+        check_registry=check_registry,
+        push=push,
+    )
 
-        if build_dir is None:
-            image_build_dir = spath.parent / ".build" / spath.stem
-        else:
-            image_build_dir = build_dir
-            if spath != spec_path:
-                image_build_dir /= spath.parent.relative_to(spec_path)
-            image_build_dir /= spath.stem
-
-        image_build_dir.mkdir(exist_ok=True, parents=True)
-
-        # Update the spec to remove '_' prefixed keys and add in build params
-        spec = {k: v for k, v in spec.items() if not k.startswith("_")}
-        spec.update(
-            {
-                "image_tag": image_tag,
-                "docker_registry": docker_registry,
-                "use_local_packages": use_local_packages,
-                "arcana_install_extras": install_extras,
-                "test_config": use_test_config,
-            }
+    spec_paths = walk_spec_paths(spec_path)
+    if jobs > 1:
+        # Each image is built independently so they can be built in parallel
+        spec_paths = list(spec_paths)
+        # Workers connect to the Docker daemon themselves rather than inheriting a
+        # client (and its open sockets) from the parent process
+        executor = ProcessPoolExecutor(
+            max_workers=min(jobs, len(spec_paths) or 1),
+            initializer=_docker_client.cache_clear,
         )
+        results = executor.map(build_image, spec_paths)
+    else:
+        executor = None
+        results = map(build_image, spec_paths)
 
-        changelog = None
-
-        # Check the target registry to see a) if an image with the same tag
-        # already exists and b) whether it was built with the same specs
-        if check_registry:
-            extracted_dir = extract_file_from_docker_image(
-                image_tag, spec_path_in_docker
-            )
-            if extracted_dir is not None:
-                logger.info(
-                    f"Comparing build spec with that of existing image {image_tag}"
-                )
-                built_spec = load_yaml_spec(
-                    extracted_dir / Path(spec_path_in_docker).name
-                )
-                changelog = compare_specs(built_spec, spec, check_version=True)
-                if changelog:
-                    msg = (
-                        f"Spec for '{image_tag}' doesn't match the one that was "
-                        "used to build the image already in the registry (skipping):\n\n"
-                        + str(changelog.pretty())
-                    )
-                    if raise_errors:
-                        raise ArcanaBuildError(msg)
-                    else:
-                        logger.error(msg)
-                    continue
-                else:
-                    logger.info(
-                        "Skipping '%s' build as identical image already "
-                        "exists in registry"
-                    )
-                    continue
-        try:
-            build_xnat_cs_image(
-                build_dir=image_build_dir,
-                generate_only=generate_only,
-                license_dir=license_dir,
-                **spec,
-            )
-        except Exception:
-            if raise_errors:
-                raise
-            logger.error("Could not build %s pipeline:\n%s", image_tag, format_exc())
-            errors = True
-            continue
-        else:
-            click.echo(image_tag)
-            logger.info("Successfully built %s pipeline", image_tag)
+    errors = False
+    try:
+        for image_entry, image_errors in results:
+            errors |= image_errors
+            if image_entry is None:
+                continue
+            click.echo(f"{image_entry['name']}:{image_entry['version']}")
+            if release or save_manifest:
+                manifest["images"].append(image_entry)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
-        if push:
-            try:
-                dc.api.push(image_tag)
-            except Exception:
-                if raise_errors:
-                    raise
-                logger.error("Could not push '%s':\n\n%s", image_tag, format_exc())
-                errors = True
-            else:
-                logger.info("Successfully pushed '%s' to registry", image_tag)
-
-        if release or save_manifest:
-            manifest["images"].append(
-                {
-                    "name": image_name,
-                    "version": image_version,
-                    "commands": [c["name"] for c in spec["commands"]],
-                }
-            )
     if release:
         release_image_tag = f"{docker_org_fullpath}/release-{release}"
         create_metapackage(
@@ -319,7 +260,7 @@ def build(
         )
         if push:
             try:
-                dc.api.push(release_image_tag)
+                _docker_client().api.push(release_image_tag)
             except Exception:
                 if raise_errors:
                     raise
@@ -332,7 +273,7 @@ def build(
             else:
                 logger.info(
                     "Successfully pushed release metapackage '%s' to registry",
-                    image_tag,
+                    release_image_tag,
                 )
         if save_manifest:
             with open(save_manifest, "w") as f:
@@ -363,15 +304,12 @@ DOCKER_ORG is the Docker organisation the images should belong to""",
 )
 def list_images(spec_path, docker_org, docker_registry):
 
-    if isinstance(spec_path, bytes):  # FIXME: This shouldn't be necessary
-        spec_path = Path(spec_path.decode("utf-8"))
+    spec_path = _as_path(spec_path)
 
-    for spath in walk_spec_paths(spec_path):
-        spec = load_yaml_spec(spath, base_dir=spec_path)
+    for spath, spec in load_all_specs(spec_path).items():
 
         # Make image tag
-        pkg_name = spath.stem.lower()
-        tag = ".".join(spath.relative_to(spec_path).parent.parts + (pkg_name,))
+        tag = _image_name(spath, spec_path)
         image_version = str(spec.pop("pkg_version"))
         if "wrapper_version" in spec:
             image_version += f"-{spec.pop('wrapper_version')}"
@@ -395,9 +333,7 @@ module_path
 )
 @click.argument("spec_path", type=click.Path(exists=True, path_type=Path))
 def test(spec_path):
-    # FIXME: Workaround for click 7.x, which improperly handles path_type
-    if type(spec_path) is bytes:
-        spec_path = Path(spec_path.decode("utf-8"))
+    spec_path = _as_path(spec_path)
 
     raise NotImplementedError
 
@@ -419,19 +355,15 @@ The generated documentation will be saved to OUTPUT.
 @click.option("--flatten/--no-flatten", default=False)
 @click.option("--loglevel", default="warning", help="The level to display logs at")
 def build_docs(spec_path, output, root, flatten, loglevel):
-    # FIXME: Workaround for click 7.x, which improperly handles path_type
-    if type(spec_path) is bytes:
-        spec_path = Path(spec_path.decode("utf-8"))
-    if type(output) is bytes:
-        output = Path(output.decode("utf-8"))
-    if type(root) is bytes:
-        root = Path(root.decode("utf-8"))
+    spec_path = _as_path(spec_path)
+    output = _as_path(output)
+    root = _as_path(root)
 
-    logging.basicConfig(level=getattr(logging, loglevel.upper()))
+    logging.basicConfig(level=_log_level(loglevel))
 
     output.mkdir(parents=True, exist_ok=True)
 
-    for spath in walk_spec_paths(spec_path):
+    def build_doc(spath):
         spec = load_yaml_spec(spath, base_dir=spec_path)
         mod_name = spec["_module_name"]
 
@@ -439,14 +371,21 @@ def build_docs(spec_path, output, root, flatten, loglevel):
             src_file = spath.absolute().relative_to(root)
         except ValueError:
             logger.warning(
-                f"build_docs: {spath.absolute().as_posix()!r} does not lie "
-                f"within {root.as_posix()!r}, do you need to specify --root?"
+                "build_docs: %r does not lie within %r, do you need to specify "
+                "--root?",
+                spath.absolute().as_posix(),
+                root.as_posix(),
             )
             src_file = spath.absolute()
 
         create_doc(spec, output, mod_name, src_file=src_file, flatten=flatten)
         logging.info("Successfully created docs for %s", mod_name)
 
+    # Each doc is written to a separate file, so they can be generated
+    # concurrently to overlap the file I/O
+    with ThreadPoolExecutor(max_workers=DOCS_MAX_WORKERS) as executor:
+        list(executor.map(build_doc, walk_spec_paths(spec_path)))
+
 
 @deploy.command(
     name="required-packages",
@@ -459,7 +398,7 @@ def required_packages(task_locations):
     required_modules = set()
     for task_location in task_locations:
         workflow = resolve_class(task_location)
-        pydra_asdict(workflow, required_modules)
+        pydra_collect_modules(workflow, required_modules)
 
     for pkg in package_from_module(required_modules):
         click.echo(f"{pkg.key}=={pkg.version}")
@@ -474,7 +413,7 @@ def inspect_docker_exec(image_tag):
     entrypoint/cmd
 
     IMAGE_TAG is the tag of the Docker image to inspect"""
-    dc = docker.from_env()
+    dc = _docker_client()
 
     dc.images.pull(image_tag)
 
@@ -516,6 +455,8 @@ include and/or exclude, e.g.
 @click.argument("manifest_json", type=click.File())
 @click.argument("config_yaml", type=click.File())
 def pull_images(config_yaml, manifest_json):
+    import xnat as xnatpy
+
     config = yaml.load(config_yaml, Loader=yaml.Loader)
     manifest = json.load(manifest_json)
 
@@ -586,6 +527,8 @@ CONFIG_YAML a YAML file contains the login details for the XNAT server to update
     type=click.Path(exists=True),
 )
 def pull_auth_refresh(config_yaml):
+    import xnat as xnatpy
+
     with open(config_yaml) as f:
         config = yaml.load(f, Loader=yaml.Loader)
 
@@ -683,6 +626,19 @@ It can be omitted if PIPELINE_NAME matches an existing pipeline
         "by the task/workflow"
     ),
 )
+@click.option(
+    "--io",
+    "io_json",
+    default=None,
+    type=str,
+    metavar="<json>",
+    help=(
+        "JSON object with 'inputs' and/or 'outputs' lists, each entry of which is "
+        "a list of the values that would otherwise be passed to '--input' and "
+        "'--output' respectively. Parsed in one step, so it is quicker to process "
+        "than many separate '--input'/'--output' options when there are many columns"
+    ),
+)
 @click.option(
     "--row-frequency",
     "-f",
@@ -695,7 +651,10 @@ It can be omitted if PIPELINE_NAME matches an existing pipeline
     ),
 )
 @click.option(
-    "--ids", default=None, type=str, help="List of IDs to restrict the pipeline to"
+    "--ids",
+    default=None,
+    type=CsvList(),
+    help="Comma-separated list of IDs to restrict the pipeline to",
 )
 @click.option(
     "--work",
@@ -719,7 +678,10 @@ It can be omitted if PIPELINE_NAME matches an existing pipeline
     help=("The level of detail logging information is presented"),
 )
 @click.option(
-    "--dataset-hierarchy", type=str, default=None, help="Comma-separated hierarchy"
+    "--dataset-hierarchy",
+    type=CsvList(),
+    default=None,
+    help="Comma-separated hierarchy",
 )
 @click.option(
     "--dataset-space", type=str, default=None, help="The data space of the dataset"
@@ -792,6 +754,7 @@ def run_pipeline(
     dataset_space,
     dataset_hierarchy,
     ids,
+    io_json,
     configuration,
     single_row,
     export_work,
@@ -799,11 +762,18 @@ def run_pipeline(
     keep_running_on_errors,
 ):
 
-    if type(export_work) is bytes:
-        export_work = Path(export_work.decode("utf-8"))
+    from arcana.core.data.set import Dataset
+    from arcana.core.data.store import DataStore
+
+    export_work = _as_path(export_work)
+
+    if io_json is not None:
+        io_inputs, io_outputs = _parse_io_json(io_json)
+        input += io_inputs
+        output += io_outputs
 
     if loglevel != "none":
-        logging.basicConfig(stream=sys.stdout, level=getattr(logging, loglevel.upper()))
+        logging.basicConfig(stream=sys.stdout, level=_log_level(loglevel))
 
     if work_dir is None:
         work_dir = tempfile.mkdtemp()
@@ -831,12 +801,11 @@ def run_pipeline(
 
         store = DataStore.load(store_name, cache_dir=store_cache_dir)
         space = resolve_class(dataset_space, ["arcana.data.spaces"])
-        hierarchy = dataset_hierarchy.split(",")
 
         try:
             dataset = store.load_dataset(id, name)
         except KeyError:
-            dataset = store.new_dataset(id, hierarchy=hierarchy, space=space)
+            dataset = store.new_dataset(id, hierarchy=dataset_hierarchy, space=space)
 
     if single_row is not None:
         # Adds a single row to the dataset (i.e. skips a full scan)
@@ -882,14 +851,16 @@ def run_pipeline(
             path = user_input
         return path, qualifiers
 
+    columns = dataset.columns
+
     pipeline_inputs = []
     converter_args = {}  # Arguments passed to converter
     for col_name, col_format_name, match_criteria, pydra_field, format_name in input:
-        col_format = resolve_class(col_format_name, prefixes=["arcana.data.formats"])
-        format = resolve_class(format_name, prefixes=["arcana.data.formats"])
+        col_format = _resolve_format(col_format_name)
+        format = _resolve_format(format_name)
         if not match_criteria and format != DataRow:
             logger.warning(
-                f"Skipping '{col_name}' source column as no input was provided"
+                "Skipping '%s' source column as no input was provided", col_name
             )
             continue
         pipeline_inputs.append(PipelineInput(col_name, pydra_field, format))
@@ -900,8 +871,9 @@ def run_pipeline(
                     f"col_format={col_format}, format={format}"
                 )
             logger.info(
-                f"No column added for '{col_name}' column as it uses built-in "
-                "type `arcana.core.data.row.DataRow`"
+                "No column added for '%s' column as it uses built-in "
+                "type `arcana.core.data.row.DataRow`",
+                col_name,
             )
             continue
         path, qualifiers = extract_qualifiers_from_path(match_criteria)
@@ -912,11 +884,11 @@ def run_pipeline(
                 "Unrecognised qualifier namespaces extracted from path for "
                 f"{col_name} (expected ['criteria', 'converter']): {qualifiers}"
             )
-        if col_name in dataset.columns:
-            column = dataset[col_name]
-            logger.info(f"Found existing source column {column}")
+        column = columns.get(col_name)
+        if column is not None:
+            logger.info("Found existing source column %s", column)
         else:
-            logger.info(f"Adding new source column '{col_name}'")
+            logger.info("Adding new source column '%s'", col_name)
             dataset.add_source(
                 name=col_name,
                 format=col_format,
@@ -929,8 +901,8 @@ def run_pipeline(
 
     pipeline_outputs = []
     for col_name, col_format_name, path_expr, pydra_field, format_name in output:
-        format = resolve_class(format_name, prefixes=["arcana.data.formats"])
-        col_format = resolve_class(col_format_name, prefixes=["arcana.data.formats"])
+        format = _resolve_format(format_name)
+        col_format = _resolve_format(col_format_name)
         pipeline_outputs.append(PipelineOutput(col_name, pydra_field, format))
         path, qualifiers = extract_qualifiers_from_path(path_expr)
         converter_args[col_name] = qualifiers.pop("converter", {})
@@ -939,15 +911,15 @@ def run_pipeline(
                 "Unrecognised qualifier namespaces extracted from path for "
                 f"{col_name} (expected ['criteria', 'converter']): {qualifiers}"
             )
-        if col_name in dataset.columns:
-            column = dataset[col_name]
+        column = columns.get(col_name)
+        if column is not None:
             if not column.is_sink:
                 raise ArcanaUsageError(
                     "Output column name '{col_name}' shadows existing source column"
                 )
-            logger.info(f"Found existing sink column {column}")
+            logger.info("Found existing sink column %s", column)
         else:
-            logger.info(f"Adding new source column '{col_name}'")
+            logger.info("Adding new source column '%s'", col_name)
             dataset.add_sink(name=col_name, format=col_format, path=path)
 
     logger.debug("Pipeline outputs: %s", pipeline_outputs)
@@ -984,9 +956,6 @@ def run_pipeline(
     # Instantiate the Pydra workflow
     wf = pipeline(cache_dir=pipeline_cache_dir)
 
-    if ids is not None:
-        ids = ids.split(",")
-
     # execute the workflow
     try:
         result = wf(ids=ids, plugin=plugin)
@@ -1019,5 +988,222 @@ def run_pipeline(
             sys.exit(1)
 
 
+def _build_image(
+    spath: Path,
+    spec_path: Path,
+    docker_org_fullpath: str,
+    docker_registry: str,
+    build_dir: ty.Optional[Path],
+    use_local_packages: bool,
+    install_extras: ty.List[str],
+    use_test_config: bool,
+    raise_errors: bool,
+    generate_only: bool,
+    license_dir: ty.Optional[Path],
+    check_registry: bool,
+    push: bool,
+) -> ty.Tuple[ty.Optional[dict], bool]:
+    """Builds (and optionally pushes) the image specified by a single YAML spec.
+    Defined at the module level so it can be run in a separate process when
+    building multiple images in parallel (see the '--jobs' option of `build`)
+
+    Returns
+    -------
+    image_entry : dict or None
+        the entry to add to the release manifest for the built image, None if
+        the image wasn't built
+    errors : bool
+        whether any errors were logged while building or pushing the image
+    """
+    from arcana.deploy.medimage.xnat import build_xnat_cs_image
+
+    logging.info("Building '%s' image", spath)
+    spec = load_yaml_spec(spath, base_dir=spec_path)
+
+    # Make image tag
+    image_name = f"{docker_org_fullpath}/{_image_name(spath, spec_path)}"
+
+    image_version = str(spec.pop("pkg_version"))
+    if "wrapper_version" in spec:
+        image_version += f"-{spec.pop('wrapper_version')}"
+
+    image_tag = f"{image_name}:{image_version}"
+
+    if build_dir is None:
+        image_build_dir = spath.parent / ".build" / spath.stem
+    else:
+        image_build_dir = build_dir
+        if spath != spec_path:
+            image_build_dir /= spath.parent.relative_to(spec_path)
+        image_build_dir /= spath.stem
+
+    image_build_dir.mkdir(exist_ok=True, parents=True)
+
+    # Update the spec to remove '_' prefixed keys and add in build params
+    for key in [k for k in spec if k.startswith("_")]:
+        del spec[key]
+    spec.update(
+        {
+            "image_tag": image_tag,
+            "docker_registry": docker_registry,
+            "use_local_packages": use_local_packages,
+            "arcana_install_extras": install_extras,
+            "test_config": use_test_config,
+        }
+    )
+
+    changelog = None
+
+    # Check the target registry to see a) if an image with the same tag
+    # already exists and b) whether it was built with the same specs
+    if check_registry:
+        extracted_dir = extract_file_from_docker_image(image_tag, spec_path_in_docker)
+        if extracted_dir is not None:
+            logger.info(
+                "Comparing build spec with that of existing image %s", image_tag
+            )
+            built_spec = load_yaml_spec(extracted_dir / Path(spec_path_in_docker).name)
+            changelog = compare_specs(built_spec, spec, check_version=True)
+            if changelog:
+                msg = (
+                    f"Spec for '{image_tag}' doesn't match the one that was "
+                    "used to build the image already in the registry (skipping):\n\n"
+                    + str(changelog.pretty())
+                )
+                if raise_errors:
+                    raise ArcanaBuildError(msg)
+                else:
+                    logger.error(msg)
+                return None, False
+            else:
+                logger.info(
+                    "Skipping '%s' build as identical image already "
+                    "exists in registry",
+                    image_tag,
+                )
+                return None, False
+    errors = False
+    try:
+        build_xnat_cs_image(
+            build_dir=image_build_dir,
+            generate_only=generate_only,
+            license_dir=license_dir,
+            **spec,
+        )
+    except Exception:
+        if raise_errors:
+            raise
+        logger.error("Could not build %s pipeline:\n%s", image_tag, format_exc())
+        return None, True
+    else:
+        logger.info("Successfully built %s pipeline", image_tag)
+
+    if push:
+        try:
+            _docker_client().api.push(image_tag)
+        except Exception:
+            if raise_errors:
+                raise
+            logger.error("Could not push '%s':\n\n%s", image_tag, format_exc())
+            errors = True
+        else:
+            logger.info("Successfully pushed '%s' to registry", image_tag)
+
+    image_entry = {
+        "name": image_name,
+        "version": image_version,
+        "commands": [c["name"] for c in spec["commands"]],
+    }
+    return image_entry, errors
+
+
+def _as_path(path):
+    """Converts paths passed as bytes into Path objects
+
+    FIXME: Workaround for click 7.x, which improperly handles path_type, can
+    be removed along with this function now click>=8 is required
+    """
+    if isinstance(path, (bytes, bytearray)):
+        return Path(path.decode("utf-8"))
+    return path
+
+
+def _parse_io_json(io_json: str) -> ty.Tuple[tuple, tuple]:
+    """Parses and validates the value of the '--io' option of run-arcana-pipeline,
+    returning the inputs and outputs as they would be passed to '--input' and
+    '--output'"""
+    try:
+        io_spec = json.loads(io_json)
+    except ValueError as e:
+        raise click.UsageError(f"Could not parse '--io' value as JSON: {e}")
+    if not isinstance(io_spec, dict):
+        raise click.UsageError("'--io' value must be a JSON object")
+    unrecognised = set(io_spec) - {"inputs", "outputs"}
+    if unrecognised:
+        raise click.UsageError(
+            "Unrecognised keys in '--io' value, can only be 'inputs' and 'outputs': "
+            + ", ".join(sorted(unrecognised))
+        )
+    parsed = []
+    for key in ("inputs", "outputs"):
+        entries = io_spec.get(key, [])
+        if not isinstance(entries, list):
+            raise click.UsageError(f"'{key}' in '--io' value must be a list")
+        for entry in entries:
+            if not (
+                isinstance(entry, list)
+                and len(entry) == 5
+                and all(isinstance(v, str) for v in entry)
+            ):
+                raise click.UsageError(
+                    f"Entries of '{key}' in '--io' value must be lists of 5 strings, "
+                    f"found {entry!r}"
+                )
+        parsed.append(tuple(tuple(e) for e in entries))
+    return tuple(parsed)
+
+
+def _log_level(loglevel: str) -> int:
+    """Converts the name of a logging level passed to a '--loglevel' option into
+    its numeric value, accepting any name known to the logging module (e.g.
+    'warn' and 'notset' as well as 'warning', 'info', etc...)"""
+    level = logging.getLevelName(loglevel.upper())
+    if not isinstance(level, int):
+        raise click.BadParameter(
+            f"Unrecognised logging level '{loglevel}'", param_hint="'--loglevel'"
+        )
+    return level
+
+
+def _image_name(spath: Path, spec_path: Path) -> str:
+    """Derives the name of the image built from a spec from its location
+    relative to the root of the spec directory, e.g. 'mri.neuro.fmriprep'"""
+    pkg_name = spath.stem.lower()
+    if spath == spec_path:  # spec path is the spec file itself
+        return pkg_name
+    # String operations avoid creating intermediate Path objects for each spec
+    # (NB: dirname is empty for specs in the current directory)
+    rel_dir = os.path.relpath(os.path.dirname(spath) or os.curdir, spec_path)
+    if rel_dir == os.curdir:
+        return pkg_name
+    return rel_dir.replace(os.sep, ".") + "." + pkg_name
+
+
+@lru_cache(maxsize=1)
+def _docker_client():
+    """Imports the Docker SDK and connects to the Docker daemon on first use,
+    reusing the client on subsequent calls"""
+    import docker
+
+    return docker.from_env()
+
+
+@lru_cache(maxsize=None)
+def _resolve_format(name: str) -> type:
+    """Resolves a format class from its location string, caching the result as
+    many columns typically share the same format (e.g. common:Text)"""
+    return resolve_class(name, prefixes=["arcana.data.formats"])
+
+
 if __name__ == "__main__":
     run_pipeline()
@@ -9,7 +9,6 @@ from operator import mul
 import tempfile
 from pathlib import Path
 import pytest
-import docker
 import xnat
 from arcana.cli.deploy import (
     build,
@@ -17,6 +16,7 @@ from arcana.cli.deploy import (
     run_pipeline,
     pull_images,
     pull_auth_refresh,
+    _image_name,
 )
 from arcana.core.utils import class_location
 from arcana.test.fixtures.docs import all_docs_fixtures, DocsFixture
@@ -27,7 +27,7 @@ from arcana.data.formats.common import Text
 from arcana.exceptions import ArcanaBuildError
 
 
-def test_deploy_build_cli(command_spec, cli_runner, work_dir):
+def test_deploy_build_cli(command_spec, cli_runner, work_dir, docker_client):
 
     DOCKER_ORG = "testorg"
     DOCKER_REGISTRY = "test.registry.org"
@@ -75,11 +75,73 @@ def test_deploy_build_cli(command_spec, cli_runner, work_dir):
     assert tag == f"{DOCKER_REGISTRY}/{DOCKER_ORG}/{IMAGE_GROUP_NAME}.concatenate:1.0-1"
 
     # Clean up the built image
-    dc = docker.from_env()
-    dc.images.remove(tag)
+    docker_client.images.remove(tag)
 
 
-def test_deploy_rebuild_cli(command_spec, docker_registry, cli_runner, run_prefix):
+def test_deploy_build_cli_jobs(command_spec, cli_runner, work_dir):
+
+    DOCKER_ORG = "testorg"
+    IMAGE_GROUP_NAME = "testpkg"
+    PKG_NAMES = ["concatenate_a", "concatenate_b", "concatenate_c"]
+
+    concatenate_spec = {
+        "commands": [command_spec],
+        "pkg_version": "1.0",
+        "wrapper_version": "1",
+        "authors": ["some.one@an.email.org"],
+        "info_url": "http://concatenate.readthefakedocs.io",
+    }
+
+    build_dir = work_dir / "build"
+    build_dir.mkdir()
+    spec_path = work_dir / "test-specs"
+    sub_dir = spec_path / IMAGE_GROUP_NAME
+    sub_dir.mkdir(parents=True)
+    for pkg_name in PKG_NAMES:
+        with open(sub_dir / f"{pkg_name}.yml", "w") as f:
+            yaml.dump(concatenate_spec, f)
+
+    result = cli_runner(
+        build,
+        [
+            str(spec_path),
+            DOCKER_ORG,
+            "--build-dir",
+            str(build_dir),
+            "--loglevel",
+            "warning",
+            "--use-local-packages",
+            "--raise-errors",
+            "--generate-only",
+            "--jobs",
+            "2",
+        ],
+    )
+    assert result.exit_code == 0, show_cli_trace(result)
+    assert set(result.output.strip().splitlines()[-len(PKG_NAMES) :]) == set(
+        f"{DOCKER_ORG}/{IMAGE_GROUP_NAME}.{n}:1.0-1" for n in PKG_NAMES
+    )
+    for pkg_name in PKG_NAMES:
+        assert (build_dir / IMAGE_GROUP_NAME / pkg_name / "Dockerfile").exists()
+
+
+@pytest.mark.parametrize(
+    "spath,spec_path,image_name",
+    [
+        ("specs/mri/neuro/fmriprep.yml", "specs", "mri.neuro.fmriprep"),
+        ("specs/Dcm2Niix.yaml", "specs", "dcm2niix"),
+        ("specs/dcm2niix.yaml", "specs/dcm2niix.yaml", "dcm2niix"),
+        ("dcm2niix.yaml", ".", "dcm2niix"),
+        ("mri/dcm2niix.yaml", ".", "mri.dcm2niix"),
+    ],
+)
+def test_image_name(spath, spec_path, image_name):
+    assert _image_name(Path(spath), Path(spec_path)) == image_name
+
+
+def test_deploy_rebuild_cli(
+    command_spec, docker_registry, cli_runner, run_prefix, docker_client
+):
     """Tests the check to see whether"""
 
     DOCKER_ORG = "testorg"
@@ -132,8 +194,7 @@ def test_deploy_rebuild_cli(command_spec, docker_registry, cli_runner, run_prefi
     assert result.exit_code == 0, show_cli_trace(result)
     tag = result.output.strip().splitlines()[-1]
     try:
-        dc = docker.from_env()
-        dc.api.push(tag)
+        docker_client.api.push(tag)
 
         # FIXME: Need to ensure that logs are captured properly then we can test this
         # result = build_spec(concatenate_spec)
@@ -157,10 +218,10 @@ def test_deploy_rebuild_cli(command_spec, docker_registry, cli_runner, run_prefi
         result = build_spec(concatenate_spec)
         assert result.exit_code == 0, show_cli_trace(result)
         rebuilt_tag = result.output.strip().splitlines()[-1]
-        dc.images.remove(rebuilt_tag)
+        docker_client.images.remove(rebuilt_tag)
     finally:
         # Clean up the built images
-        dc.images.remove(tag)
+        docker_client.images.remove(tag)
 
 
 def _build_docs(
@@ -342,6 +403,34 @@ def test_run_pipeline_cli_fail(concatenate_task, saved_dataset, cli_runner, work
     # TODO: Should try to read logs to check for error message but can't work out how to capture them
 
 
+@pytest.mark.parametrize(
+    "io_json",
+    [
+        "not json",
+        "[]",
+        '{"inputs": [], "sinks": []}',
+        '{"inputs": {"source1": "common:Text"}}',
+        '{"outputs": [["sink1", "common:Text", "concatenated", "out_file"]]}',
+        '{"inputs": [["source1", "common:Text", "file1", "in_file1", 1]]}',
+    ],
+)
+def test_run_pipeline_cli_bad_io(io_json, saved_dataset, cli_runner, work_dir):
+    result = cli_runner(
+        run_pipeline,
+        [
+            make_dataset_id_str(saved_dataset),
+            "a_pipeline",
+            "arcana.test.tasks:concatenate",
+            "--io",
+            io_json,
+            "--work",
+            str(work_dir),
+        ],
+    )
+    assert result.exit_code == 2, show_cli_trace(result)
+    assert "'--io' value" in result.output
+
+
 def test_run_pipeline_on_row_cli(cli_runner, work_dir):
 
     # Create test dataset consisting of a single row with a range of filenames
@@ -475,7 +564,12 @@ def test_run_pipeline_cli_converter_args(saved_dataset, cli_runner, work_dir):
     "Skipping in CI as can't get insecure registries setup on GitHub Actions"
 )
 def test_pull_images(
-    xnat_repository, command_spec, work_dir, docker_registry_for_xnat_uri, cli_runner
+    xnat_repository,
+    command_spec,
+    work_dir,
+    docker_registry_for_xnat_uri,
+    cli_runner,
+    docker_client,
 ):
 
     DOCKER_ORG = "pulltestorg"
@@ -560,9 +654,8 @@ def test_pull_images(
     )
 
     # Delete images from local Docker instance (which the test XNAT uses)
-    dc = docker.from_env()
     for img in expected_images:
-        dc.images.remove(img)
+        docker_client.images.remove(img)
 
     config_path = work_dir / "config.yaml"
     with open(config_path, "w") as f:
@@ -9,6 +9,19 @@ def cli():
     pass
 
 
+class CsvList(click.ParamType):
+    """Click parameter type that splits a comma-separated string into a list,
+    so the option values only need to be parsed once by Click. Whitespace around
+    the items is stripped and empty items are dropped"""
+
+    name = "csv-list"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, str):
+            return [v.strip() for v in value.split(",") if v.strip()]
+        return list(value)
+
+
 # import sys
 # import logging
 # from abc import ABCMeta, abstractclassmethod
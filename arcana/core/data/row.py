@@ -39,6 +39,10 @@ class DataRow:
     ] = attrs.field(factory=lambda: defaultdict(dict), repr=False)
     _unresolved = attrs.field(default=None, repr=False)
     _items = attrs.field(factory=dict, init=False, repr=False)
+    _hierarchy_id = attrs.field(default=None, init=False, repr=False, eq=False)
+    # The relative path of the row within a file-system based store, which is cached
+    # by the store as it only depends on the IDs of the row
+    _path_cache = attrs.field(default=None, init=False, repr=False, eq=False)
 
     def __getitem__(self, column_name):
         """Gets the item for the current row
@@ -92,6 +96,15 @@ class DataRow:
     def label(self):
         return self.path[-1]
 
+    @property
+    def hierarchy_id(self) -> str:
+        """The IDs of the row for each layer of the dataset hierarchy joined by
+        underscores (e.g. 'sub-01_ses-02'). Evaluated lazily and cached as it is
+        used to prefix the names of every file stored in the row"""
+        if self._hierarchy_id is None:
+            self._hierarchy_id = "_".join(self.ids[h] for h in self.dataset.hierarchy)
+        return self._hierarchy_id
+
     def __iter__(self):
         return iter(self.keys())
 
@@ -131,6 +131,12 @@ class Dataset:
         factory=dict, converter=default_if_none(factory=dict), repr=False
     )
     _root: DataRow = attrs.field(default=None, init=False, repr=False, eq=False)
+    _layer_id_regexes: ty.List[ty.List[re.Pattern]] = attrs.field(
+        default=None, init=False, repr=False, eq=False
+    )
+    _composite_freqs: ty.List[ty.Tuple[DataSpace, ty.List[DataSpace]]] = attrs.field(
+        default=None, init=False, repr=False, eq=False
+    )
 
     def __attrs_post_init__(self):
         # Ensure that hierarchy items are in the DataSpace enums not strings
@@ -295,6 +301,19 @@ class Dataset:
 
     def _set_root(self):
         self._root = DataRow({self.root_freq: None}, self.root_freq, self)
+        # The ID inference patterns of each layer of the hierarchy are compiled
+        # once per tree instead of being looked up for every leaf that is added
+        self._layer_id_regexes = [
+            [re.compile(r) for ln, r in self.id_inference if ln == layer]
+            for layer in self.hierarchy
+        ]
+        # The non-basis frequencies (and the basis frequencies they span) that
+        # composite IDs are created for in each leaf, which are the same for every
+        # leaf as leaves are always of the maximum frequency
+        leaf_span = set(max(self.space).span())
+        self._composite_freqs = [
+            (f, f.span()) for f in self.space if f not in leaf_span
+        ]
 
     def refresh(self):
         """Refresh the dataset rows"""
@@ -531,12 +550,13 @@ class Dataset:
             )
         # Set a default ID of None for all parent frequencies that could be
         # inferred from a row at this depth
-        ids = {f: None for f in self.space}
+        ids = dict.fromkeys(self.space)
         # Calculate the combined freqs after each layer is added
         row_frequency = self.space(0)
-        for layer, label in zip(self.hierarchy, tree_path):
+        for layer, label, regexes in zip(
+            self.hierarchy, tree_path, self._layer_id_regexes
+        ):
             ids[layer] = label
-            regexes = [r for ln, r in self.id_inference if ln == layer]
             if not regexes:
                 # If the layer introduces completely new axes then the axis
                 # with the least significant bit (the order of the bits in the
@@ -562,11 +582,11 @@ class Dataset:
                     ids[layer.span()[-1]] = label
             else:
                 for regex in regexes:
-                    match = re.match(regex, label)
+                    match = regex.match(label)
                     if match is None:
                         raise ArcanaBadlyFormattedIDError(
                             f"{layer} label '{label}', does not match ID inference"
-                            f" pattern '{regex}'"
+                            f" pattern '{regex.pattern}'"
                         )
                     new_freqs = (layer ^ row_frequency) & layer
                     for target_freq, target_id in match.groupdict().items():
@@ -580,7 +600,7 @@ class Dataset:
                             raise ArcanaUsageError(
                                 f"ID '{target_freq}' is specified twice in the ID "
                                 f"inference of {tree_path} ({ids[target_freq]} "
-                                f"and {target_id} from {regex}"
+                                f"and {target_id} from {regex.pattern}"
                             )
                         ids[target_freq] = target_id
             row_frequency |= layer
@@ -590,9 +610,9 @@ class Dataset:
         ids.update(explicit_ids)
         # Create composite IDs for non-basis frequencies if they are not
         # explicitly in the layer dimensions
-        for freq in set(self.space) - set(row_frequency.span()):
+        for freq, freq_span in self._composite_freqs:
             if ids[freq] is None:
-                id = tuple(ids[b] for b in freq.span() if ids[b] is not None)
+                id = tuple(ids[b] for b in freq_span if ids[b] is not None)
                 if id:
                     if len(id) == 1:
                         id = id[0]
@@ -1,6 +1,7 @@
 import typing as ty
 import re
 from enum import Enum
+from functools import lru_cache
 from arcana.core.utils import class_location, resolve_class
 
 
@@ -80,18 +81,20 @@ class DataSpace(Enum):
             matchedpoint -> [timepoint, member]
             session -> [timepoint, group, member]
         """
-        # Check which bits are '1', and append them to the list of levels
-        cls = type(self)
-        return [cls(b) for b in sorted(self.nonzero_bits(), reverse=True)]
+        # The span of each member is constant so it is cached on the member the
+        # first time it is requested
+        try:
+            span = self._span
+        except AttributeError:
+            # Check which bits are '1', and append them to the list of levels
+            cls = type(self)
+            span = self._span = tuple(
+                cls(b) for b in reversed(_nonzero_bits(self.value))
+            )
+        return list(span)
 
     def nonzero_bits(self):
-        v = self.value
-        nonzero = []
-        while v:
-            w = v & (v - 1)
-            nonzero.append(w ^ v)
-            v = w
-        return nonzero
+        return list(_nonzero_bits(self.value))
 
     def __iter__(self):
         "Iterate over bit string"
@@ -101,7 +104,7 @@ class DataSpace(Enum):
             bit >>= 1
 
     def is_basis(self):
-        return len(self._nonzero_bits()) == 1
+        return len(_nonzero_bits(self.value)) == 1
 
     def __eq__(self, other):
         return self.value == other.value
@@ -171,3 +174,10 @@ class DataSpace(Enum):
     def fromstr(cls, s):
         class_loc, val = re.match(r"(.*)\[([^\]]+)\]", s).groups()
         return resolve_class(class_loc)[val]
+
+
+@lru_cache(maxsize=None)
+def _nonzero_bits(value: int) -> ty.Tuple[int, ...]:
+    """Returns the values of the bits that are set in an integer in ascending
+    order. Cached as the enum members only take a small number of values"""
+    return tuple(1 << i for i in range(value.bit_length()) if value >> i & 1)
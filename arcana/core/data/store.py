@@ -1,4 +1,7 @@
 import logging
+import os
+from copy import deepcopy
+from functools import lru_cache
 from abc import abstractmethod, ABCMeta
 from pathlib import Path
 import attrs
@@ -378,11 +381,17 @@ class DataStore(metaclass=ABCMeta):
     def load_saved_entries(cls, config_path: Path = None):
         if config_path is None:
             config_path = get_config_file_path(cls.CONFIG_NAME)
-        if config_path.exists():
-            with open(config_path) as f:
-                entries = yaml.load(f, Loader=yaml.Loader)
-        else:
+        try:
+            stat = os.stat(config_path)
+        except FileNotFoundError:
             entries = {}
+        else:
+            # The parsed entries are cached against the modification time and
+            # size of the config file, so a copy is returned as the entries
+            # are updated in place by the callers
+            entries = deepcopy(
+                _load_config_file(str(config_path), stat.st_mtime_ns, stat.st_size)
+            )
         return entries
 
     @classmethod
@@ -415,3 +424,14 @@ class DataStore(metaclass=ABCMeta):
         except AttributeError:
             alias = cls.__name__.lower()
         return alias
+
+
+@lru_cache(maxsize=32)
+def _load_config_file(path: str, mtime_ns: int, size: int) -> dict:
+    """Loads the saved data store entries from the config file, cached on the
+    path, modification time and size of the file so that repeated loads (e.g.
+    by `run_pipeline` invocations within the same process) are only parsed once
+    """
+    with open(path) as f:
+        entries = yaml.load(f, Loader=yaml.Loader)
+    return entries if entries is not None else {}
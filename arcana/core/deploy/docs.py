@@ -1,10 +1,20 @@
+import io
+import re
+import json
+import typing as ty
+from functools import lru_cache
 from pathlib import Path
 
-import yaml
-
 from arcana.core.utils import resolve_class
 from arcana.data.formats import Directory
 
+# Translation table used to escape the contents of markdown table cells
+_PIPE_ESCAPE = str.maketrans({"|": "\\|", "\n": " "})
+
+# Strings that can be written as plain (unquoted) YAML scalars
+_PLAIN_YAML_RE = re.compile(r"[A-Za-z_][\w.\-/]*")
+_YAML_KEYWORDS = frozenset(("true", "false", "yes", "no", "on", "off", "null"))
+
 
 def create_doc(spec, doc_dir, pkg_name, src_file, flatten: bool):
     header = {
@@ -24,94 +34,98 @@ def create_doc(spec, doc_dir, pkg_name, src_file, flatten: bool):
 
         out_dir.mkdir(parents=True, exist_ok=True)
 
-    with open(f"{out_dir}/{pkg_name}.md", "w") as f:
-        f.write("---\n")
-        yaml.dump(header, f)
-        f.write("\n---\n\n")
-
-        f.write("## Package Info\n")
-        tbl_info = MarkdownTable(f, "Key", "Value")
-        if spec.get("version", None):
-            tbl_info.write_row("Version", spec["version"])
-        if spec.get("pkg_version", None):
-            tbl_info.write_row("App version", spec["pkg_version"])
-        # if task.image and task.image != ':':
-        #     tbl_info.write_row("Image", escaped_md(task.image))
-        if spec.get("base_image", None):  # and task.image != spec["base_image"]:
-            tbl_info.write_row("Base image", escaped_md(spec["base_image"]))
-        if spec.get("maintainer", None):
-            tbl_info.write_row("Maintainer", spec["maintainer"])
-        if spec.get("info_url", None):
-            tbl_info.write_row("Info URL", spec["info_url"])
-
-        f.write("\n")
-
-        if "licenses" in spec:
-            f.write("### Required licenses\n")
-
-            tbl_lic = MarkdownTable(f, "Source file", "Info")
-            for lic in spec.get("licenses", []):
-                tbl_lic.write_row(
-                    escaped_md(lic.get("source", None)),
-                    lic.get("description", ""),
+    # Build up the document in memory and write it out in one go
+    buf = io.StringIO()
+    buf.write("---\n")
+    # The header is small and simple enough that it isn't worth invoking the
+    # YAML emitter for it (keys are sorted to match yaml.dump)
+    buf.write("".join(f"{k}: {_yaml_scalar(v)}\n" for k, v in sorted(header.items())))
+    buf.write("\n---\n\n")
+
+    buf.write("## Package Info\n")
+    tbl_info = MarkdownTable(buf, "Key", "Value")
+    if spec.get("version", None):
+        tbl_info.write_row("Version", spec["version"])
+    if spec.get("pkg_version", None):
+        tbl_info.write_row("App version", spec["pkg_version"])
+    # if task.image and task.image != ':':
+    #     tbl_info.write_row("Image", escaped_md(task.image))
+    if spec.get("base_image", None):  # and task.image != spec["base_image"]:
+        tbl_info.write_row("Base image", escaped_md(spec["base_image"]))
+    if spec.get("maintainer", None):
+        tbl_info.write_row("Maintainer", spec["maintainer"])
+    if spec.get("info_url", None):
+        tbl_info.write_row("Info URL", spec["info_url"])
+
+    buf.write("\n")
+
+    if "licenses" in spec:
+        buf.write("### Required licenses\n")
+
+        tbl_lic = MarkdownTable(buf, "Source file", "Info")
+        for lic in spec.get("licenses", []):
+            tbl_lic.write_row(
+                escaped_md(lic.get("source", None)),
+                lic.get("description", ""),
+            )
+
+        buf.write("\n")
+
+    buf.write("## Commands\n")
+
+    for cmd in spec["commands"]:
+
+        short_desc = cmd.get("long_description", None) or cmd["description"]
+        buf.write(f"### {cmd['name']}\n{short_desc}\n\n")
+
+        tbl_cmd = MarkdownTable(buf, "Key", "Value")
+        tbl_cmd.write_row("Short description", cmd["description"])
+        # if cmd.get("configuration"):
+        #     config = cmd["configuration"]
+        #     # configuration keys are variable depending on the workflow class
+        if row_frequency := cmd.get("row_frequency"):
+            tbl_cmd.write_row("Operates on", row_frequency.title())
+
+        if known_issues := cmd.get("known_issues"):
+            if known_issues.get("url"):
+                tbl_cmd.write_row("Known issues", known_issues["url"])
+            # Leaving room to extend known_issues further, e.g., an inplace list of issues
+
+        buf.write("#### Inputs\n")
+        tbl_inputs = MarkdownTable(buf, "Name", "Format", "Description")
+        if inputs := cmd.get("inputs"):
+            for inpt in inputs:
+                tbl_inputs.write_row(
+                    escaped_md(inpt["name"]),
+                    _format_html(inpt.get("stored_format")),
+                    inpt.get("description", ""),
+                )
+            buf.write("\n")
+
+        buf.write("#### Outputs\n")
+        tbl_outputs = MarkdownTable(buf, "Name", "Format", "Description")
+        if outputs := cmd.get("outputs"):
+            for outpt in outputs:
+                tbl_outputs.write_row(
+                    escaped_md(outpt["name"]),
+                    _format_html(outpt.get("stored_format")),
+                    outpt.get("description", ""),
                 )
+            buf.write("\n")
+
+        if parameters := cmd.get("parameters"):
+            buf.write("#### Parameters\n")
+            tbl_params = MarkdownTable(buf, "Name", "Data type", "Description")
+            for param in parameters:
+                tbl_params.write_row(
+                    escaped_md(param["name"]),
+                    escaped_md(param["type"]),
+                    param.get("description", ""),
+                )
+            buf.write("\n")
 
-            f.write("\n")
-
-        f.write("## Commands\n")
-
-        for cmd in spec["commands"]:
-
-            f.write(f"### {cmd['name']}\n")
-
-            short_desc = cmd.get("long_description", None) or cmd["description"]
-            f.write(f"{short_desc}\n\n")
-
-            tbl_cmd = MarkdownTable(f, "Key", "Value")
-            tbl_cmd.write_row("Short description", cmd["description"])
-            # if cmd.get("configuration"):
-            #     config = cmd["configuration"]
-            #     # configuration keys are variable depending on the workflow class
-            if cmd.get("row_frequency"):
-                tbl_cmd.write_row("Operates on", cmd["row_frequency"].title())
-
-            if cmd.get("known_issues"):
-                if cmd["known_issues"].get("url"):
-                    tbl_cmd.write_row("Known issues", cmd["known_issues"]["url"])
-                # Leaving room to extend known_issues further, e.g., an inplace list of issues
-
-            f.write("#### Inputs\n")
-            tbl_inputs = MarkdownTable(f, "Name", "Format", "Description")
-            if cmd.get("inputs"):
-                for inpt in cmd["inputs"]:
-                    tbl_inputs.write_row(
-                        escaped_md(inpt["name"]),
-                        _format_html(inpt.get("stored_format")),
-                        inpt.get("description", ""),
-                    )
-                f.write("\n")
-
-            f.write("#### Outputs\n")
-            tbl_outputs = MarkdownTable(f, "Name", "Format", "Description")
-            if cmd.get("outputs"):
-                for outpt in cmd.get("outputs", []):
-                    tbl_outputs.write_row(
-                        escaped_md(outpt["name"]),
-                        _format_html(outpt.get("stored_format")),
-                        outpt.get("description", ""),
-                    )
-                f.write("\n")
-
-            if cmd.get("parameters"):
-                f.write("#### Parameters\n")
-                tbl_params = MarkdownTable(f, "Name", "Data type", "Description")
-                for param in cmd.get("parameters", []):
-                    tbl_params.write_row(
-                        escaped_md(param["name"]),
-                        escaped_md(param["type"]),
-                        param.get("description", ""),
-                    )
-                f.write("\n")
+    with open(f"{out_dir}/{pkg_name}.md", "w") as f:
+        f.write(buf.getvalue())
 
 
 def _format_html(format):
@@ -133,22 +147,39 @@ def _format_html(format):
     return f'<span data-toggle="tooltip" data-placement="bottom" title="{format}" aria-label="{format}">{text}</span>'
 
 
+def _yaml_scalar(value) -> str:
+    if isinstance(value, str):
+        if _PLAIN_YAML_RE.fullmatch(value) and value.lower() not in _YAML_KEYWORDS:
+            return value
+        # JSON strings are valid double-quoted YAML scalars
+        return json.dumps(value)
+    return str(value)
+
+
 def escaped_md(value: str) -> str:
     if not value:
         return ""
     return f"`{value}`"
 
 
+@lru_cache(maxsize=None)
+def _table_header(headers: ty.Tuple[str, ...]) -> str:
+    """Renders the header and separator rows of a table, which only depend on the
+    column names and so only need to be rendered once per table type"""
+    names = "|".join(h.translate(_PIPE_ESCAPE) for h in headers)
+    separators = "|".join("-" * len(h) for h in headers)
+    return f"|{names}|\n|{separators}|\n"
+
+
 class MarkdownTable:
-    def __init__(self, f, *headers: str) -> None:
+    def __init__(self, f: io.StringIO, *headers: str) -> None:
         self.headers = tuple(headers)
 
         self.f = f
         self._write_header()
 
     def _write_header(self):
-        self.write_row(*self.headers)
-        self.write_row(*("-" * len(x) for x in self.headers))
+        self.f.write(_table_header(self.headers))
 
     def write_row(self, *cols: str):
         cols = list(cols)
@@ -160,7 +191,6 @@ class MarkdownTable:
         # pad empty column entries if there's not enough
         cols += [""] * (len(self.headers) - len(cols))
 
-        # TODO handle new lines in col
         self.f.write(
-            "|" + "|".join(str(col).replace("|", "\\|") for col in cols) + "|\n"
+            "|" + "|".join(str(col).translate(_PIPE_ESCAPE) for col in cols) + "|\n"
         )
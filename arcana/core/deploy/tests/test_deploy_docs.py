@@ -0,0 +1,28 @@
+import pytest
+import yaml
+from arcana.core.deploy.docs import _yaml_scalar
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "plain",
+        "mri.neuro/fmriprep-20.2_1",
+        "key: value",
+        "ends with colon:",
+        'has "double" quotes',
+        "has 'single' quotes",
+        "# looks like a comment",
+        "yes",
+        "No",
+        "null",
+        "OFF",
+        "1.0",
+        "",
+        10,
+        1.5,
+        True,
+    ],
+)
+def test_yaml_scalar(value):
+    assert yaml.safe_load(f"key: {_yaml_scalar(value)}\n") == {"key": value}
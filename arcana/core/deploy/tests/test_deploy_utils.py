@@ -0,0 +1,135 @@
+from pathlib import Path
+import pytest
+import yaml
+from arcana.core.deploy.utils import (
+    PipSpec,
+    load_all_specs,
+    load_yaml_spec,
+    walk_spec_paths,
+    HEADER_LINES,
+)
+
+
+def test_pip_spec_unique_merges_extras():
+    merged = PipSpec.unique(
+        [
+            PipSpec("pydra", extras=["dask"]),
+            PipSpec("pydra", extras=["psij"]),
+            PipSpec("pydra", extras=["dask"]),
+        ]
+    )
+    assert merged == [PipSpec("pydra", extras=["dask", "psij"])]
+
+
+def test_pip_spec_unique_merges_extras_of_equal_length():
+    # The merged extras have the same number of entries as the first spec so
+    # mustn't be skipped by a length comparison
+    merged = PipSpec.unique(
+        [
+            PipSpec("pydra", extras=["dask", "dask"]),
+            PipSpec("pydra", extras=["psij"]),
+        ]
+    )
+    assert merged == [PipSpec("pydra", extras=["dask", "psij"])]
+
+
+def test_pip_spec_unique_from_dicts():
+    merged = PipSpec.unique(
+        [
+            {"name": "arcana", "version": "1.0"},
+            {"name": "pydra", "version": "0.20", "extras": ["dask"]},
+            {"name": "pydra", "version": "0.20"},
+        ],
+        remove_arcana=True,
+    )
+    assert merged == [PipSpec("pydra", version="0.20", extras=["dask"])]
+
+
+@pytest.fixture
+def spec_dir(tmp_path):
+    spec_dir = tmp_path / "specs"
+    for rel_path in [
+        "top.yml",
+        "mri/neuro/fmriprep.yaml",
+        "mri/neuro/freesurfer.yml",
+        "mri/dcm2niix.yml",
+        "mri/README.md",
+        ".hidden/skipped.yml",
+        "mri/.build/skipped.yml",
+    ]:
+        path = spec_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            yaml.dump({"name": path.stem, "version": "1.0"}, f)
+    return spec_dir
+
+
+def test_walk_spec_paths(spec_dir):
+    found = [p.relative_to(spec_dir).as_posix() for p in walk_spec_paths(spec_dir)]
+    assert sorted(found) == [
+        "mri/dcm2niix.yml",
+        "mri/neuro/fmriprep.yaml",
+        "mri/neuro/freesurfer.yml",
+        "top.yml",
+    ]
+    spec_file = spec_dir / "top.yml"
+    assert list(walk_spec_paths(spec_file)) == [spec_file]
+
+
+def test_load_all_specs(spec_dir):
+    specs = load_all_specs(spec_dir)
+    assert list(specs) == list(walk_spec_paths(spec_dir))
+    relative_dirs = {}
+    for path, spec in specs.items():
+        assert spec["name"] == spec["_module_name"] == path.stem
+        relative_dirs[path.stem] = spec["_relative_dir"]
+    assert relative_dirs == {
+        "top": "",
+        "fmriprep": "mri/neuro",
+        "freesurfer": "mri/neuro",
+        "dcm2niix": "mri",
+    }
+
+
+def test_load_yaml_spec_header_only(tmp_path):
+    spec = {
+        "name": "a_spec",
+        "version": "1.0",
+        # Long enough to straddle the end of the header
+        "packages": [f"package{i}" for i in range(HEADER_LINES)],
+        "description": "after the header",
+    }
+    spec_path = tmp_path / "a_spec.yml"
+    with open(spec_path, "w") as f:
+        yaml.dump(spec, f, sort_keys=False)
+    header = load_yaml_spec(spec_path, header_only=True)
+    # The field truncated by the end of the header is omitted instead of being
+    # returned incomplete, along with those after it
+    assert header == {
+        "name": "a_spec",
+        "version": "1.0",
+        "_relative_dir": "",
+        "_module_name": "a_spec",
+    }
+    assert load_yaml_spec(spec_path)["packages"] == spec["packages"]
+
+
+def test_load_yaml_spec_header_only_short_file(tmp_path):
+    spec_path = tmp_path / "a_spec.yml"
+    with open(spec_path, "w") as f:
+        yaml.dump({"name": "a_spec", "packages": ["a", "b"]}, f)
+    assert load_yaml_spec(spec_path, header_only=True) == load_yaml_spec(spec_path)
+
+
+def test_walk_spec_paths_header_filter(spec_dir):
+    found = walk_spec_paths(spec_dir, header_filter=lambda h: h["name"] == "fmriprep")
+    assert list(found) == [spec_dir / "mri" / "neuro" / "fmriprep.yaml"]
+
+
+def test_load_yaml_spec_relative_dir(spec_dir, monkeypatch):
+    spec = load_yaml_spec(spec_dir / "mri/neuro/fmriprep.yaml", base_dir=spec_dir)
+    assert spec["_relative_dir"] == "mri/neuro"
+    # A relative spec path with an absolute base dir
+    monkeypatch.chdir(spec_dir)
+    spec = load_yaml_spec(Path("mri/neuro/fmriprep.yaml"), base_dir=spec_dir)
+    assert spec["_relative_dir"] == "mri/neuro"
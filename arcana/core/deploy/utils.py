@@ -1,13 +1,17 @@
 import typing as ty
+import sys
 from pathlib import Path, PosixPath
-import json
 import site
 import tempfile
 import tarfile
 import logging
-from itertools import chain
-import pkg_resources
+import re
+import importlib_metadata
 import os
+from copy import deepcopy
+from types import MappingProxyType
+from functools import lru_cache
+from itertools import islice
 from dataclasses import dataclass, field as dataclass_field
 import docker
 from deepdiff import DeepDiff
@@ -16,9 +20,31 @@ from arcana import __version__
 from arcana.__about__ import PACKAGE_NAME
 from arcana.exceptions import ArcanaBuildError
 from arcana.exceptions import ArcanaError
+from arcana.core.utils import json_loads
 
 logger = logging.getLogger("arcana")
 
+# Use the libyaml-backed loader where available as it is significantly faster
+# than the pure-Python implementation
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+class SpecLoader(SafeLoader):
+    """Loader for deploy-build specifications, subclassed so that the custom
+    constructors used in the specs aren't registered on the global YAML loader"""
+
+
+def _concat(loader, node):
+    seq = loader.construct_sequence(node)
+    return "".join([str(i) for i in seq])
+
+
+SpecLoader.add_constructor(tag="!join", constructor=_concat)
+SpecLoader.add_constructor(tag="!concat", constructor=_concat)
+
 
 @dataclass
 class PipSpec:
@@ -56,15 +82,19 @@ class PipSpec:
             if there is a mismatch between two entries of the same package
         """
         dct = {}
+        # Extras of repeated packages are accumulated in sets and only assigned
+        # back to the merged specs at the end
+        extras = {}
         for pip_spec in pip_specs:
             if isinstance(pip_spec, dict):
-                pkg_spec = PipSpec(**pkg_spec)
+                pip_spec = PipSpec(**pip_spec)
             if pip_spec.name == PACKAGE_NAME and remove_arcana:
                 continue
             try:
                 prev_spec = dct[pip_spec.name]
             except KeyError:
                 dct[pip_spec.name] = pip_spec
+                extras[pip_spec.name] = set(pip_spec.extras)
             else:
                 if (
                     prev_spec.version != pip_spec.version
@@ -75,11 +105,13 @@ class PipSpec:
                         f"Cannot install '{pip_spec.name}' due to conflict "
                         f"between requested versions, {pip_spec} and {prev_spec}"
                     )
-                prev_spec.extras.extend(pip_spec.extras)
+                extras[pip_spec.name].update(pip_spec.extras)
+        for name, pip_spec in dct.items():
+            pip_spec.extras = sorted(extras[name])
         return list(dct.values())
 
 
-def load_yaml_spec(path: Path, base_dir: Path = None):
+def load_yaml_spec(path: Path, base_dir: Path = None, header_only: bool = False):
     """Loads a deploy-build specification from a YAML file
 
     Parameters
@@ -88,53 +120,167 @@ def load_yaml_spec(path: Path, base_dir: Path = None):
         path to the YAML file to load
     base_dir : Path
         path to the base directory of the suite of specs to be read
+    header_only : bool
+        only parse the top-level fields that are completely contained within the
+        first HEADER_LINES lines of the file. Can be used to cheaply filter specs
+        on fields at the top of the file (e.g. name and version) before loading
+        them in full, but omits the fields defined further down the file
 
     Returns
     -------
     dict
         The loaded dictionary
     """
-
-    def concat(loader, node):
-        seq = loader.construct_sequence(node)
-        return "".join([str(i) for i in seq])
-
-    yaml.SafeLoader.add_constructor(tag="!join", constructor=concat)
-    yaml.SafeLoader.add_constructor(tag="!concat", constructor=concat)
-
-    with open(path, "r") as f:
-        data = yaml.load(f, Loader=yaml.SafeLoader)
+    stat = os.stat(path)
+    # Parsed specs are cached against the modification time and size of the
+    # file, so a copy is returned as callers are free to modify it
+    data = deepcopy(
+        _parse_yaml_spec(str(path), stat.st_mtime_ns, stat.st_size, header_only)
+    )
 
     # row_frequency = data.get('row_frequency', None)
     # if row_frequency:
     #     # TODO: Handle other row_frequency types, are there any?
     #     data['row_frequency'] = Clinical[row_frequency.split('.')[-1]]
 
+    path = Path(path)
+    if base_dir:
+        try:
+            relative_dir = str(path.relative_to(base_dir).parent)
+        except ValueError:
+            # Not lexically within the base dir (e.g. one path is relative and the
+            # other absolute, or they differ by a symlink)
+            relative_dir = os.path.dirname(os.path.relpath(path, base_dir))
+        data["_relative_dir"] = relative_dir if relative_dir != "." else ""
+    else:
+        data["_relative_dir"] = ""
+    data["_module_name"] = path.stem
+
+    return data
+
+
+@lru_cache(maxsize=4096)
+def _parse_yaml_spec(
+    path: str, mtime_ns: int, size: int, header_only: bool = False
+) -> dict:
+    """Parses a YAML spec file, cached on the path, modification time and size
+    of the file so that repeated loads of an unchanged file are only parsed once
+
+    Parameters
+    ----------
+    path : str
+        path to the YAML file to parse
+    mtime_ns : int
+        modification time of the file (used as part of the cache key)
+    size : int
+        size of the file (used as part of the cache key)
+    header_only : bool
+        only parse the top-level fields within the first HEADER_LINES lines
+
+    Returns
+    -------
+    dict
+        The parsed dictionary
+    """
+    data = None
+    with open(path, "r") as f:
+        if header_only:
+            # Read one line past the header to tell whether the file continues
+            lines = list(islice(f, HEADER_LINES + 1))
+            if len(lines) <= HEADER_LINES:
+                header = lines  # the whole file
+            else:
+                # The last top-level field in the header may be truncated, so the
+                # header is cut at the start of it (i.e. at the last line that
+                # begins a top-level key)
+                header = next(
+                    (
+                        lines[:i]
+                        for i in range(HEADER_LINES, 0, -1)
+                        if _TOP_LEVEL_KEY_RE.match(lines[i])
+                    ),
+                    None,
+                )
+            if header is not None:
+                try:
+                    data = yaml.load("".join(header), Loader=SpecLoader)
+                except yaml.YAMLError:
+                    data = None
+                if type(data) is not dict:
+                    data = None
+            if data is None:
+                # Fall back to parsing the full file
+                data = yaml.load("".join(lines) + f.read(), Loader=SpecLoader)
+        else:
+            data = yaml.load(f, Loader=SpecLoader)
+
     if type(data) is not dict:
         raise ValueError(f"{path!r} didn't contain a dict!")
 
-    data["_relative_dir"] = (
-        os.path.dirname(os.path.relpath(path, base_dir)) if base_dir else ""
-    )
-    data["_module_name"] = os.path.basename(path).rsplit(".", maxsplit=1)[0]
-
     return data
 
 
-def walk_spec_paths(spec_path: Path) -> ty.Iterable[Path]:
+def walk_spec_paths(
+    spec_path: Path, header_filter: ty.Callable[[dict], bool] = None
+) -> ty.Iterable[Path]:
     """Walk a directory structure and return all YAML specs found with it
 
     Parameters
     ----------
     spec_path : Path
         path to the directory
+    header_filter : Callable[[dict], bool], optional
+        if provided, only specs for which it returns True when passed their header
+        (see the 'header_only' option of `load_yaml_spec`) are returned, e.g. to
+        select specs by name or version without parsing them in full
     """
     if spec_path.is_file():
-        yield spec_path
-    else:
-        for path in chain(spec_path.rglob("*.yml"), spec_path.rglob("*.yaml")):
-            if not any(p.startswith(".") for p in path.parts):
-                yield path
+        if header_filter is None or header_filter(
+            load_yaml_spec(spec_path, header_only=True)
+        ):
+            yield spec_path
+        return
+    # Walks the tree with os.scandir and an explicit stack of directories instead
+    # of Path.rglob (or nested generators) so that the file-type information
+    # cached in each DirEntry can be used, avoiding a stat call per entry, and
+    # Path objects are only created for the specs that are yielded
+    dirs = [str(spec_path)]
+    while dirs:
+        with os.scandir(dirs.pop()) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                elif entry.name.endswith((".yml", ".yaml")) and entry.is_file():
+                    path = Path(entry.path)
+                    if header_filter is None or header_filter(
+                        load_yaml_spec(path, base_dir=spec_path, header_only=True)
+                    ):
+                        yield path
+
+
+def load_all_specs(spec_path: Path, base_dir: Path = None) -> ty.Dict[Path, dict]:
+    """Loads all the deploy-build specifications found within a directory
+    structure (or a single spec file)
+
+    Parameters
+    ----------
+    spec_path : Path
+        path to a spec file or directory containing spec files
+    base_dir : Path
+        path to the base directory of the suite of specs to be read, defaults to
+        the spec path
+
+    Returns
+    -------
+    dict[Path, dict]
+        the loaded specs keyed by the path they were loaded from, in the order
+        they were found
+    """
+    if base_dir is None:
+        base_dir = spec_path
+    return {p: load_yaml_spec(p, base_dir=base_dir) for p in walk_spec_paths(spec_path)}
 
 
 def local_package_location(pip_spec: PipSpec, pypi_fallback: bool = False):
@@ -159,43 +305,41 @@ def local_package_location(pip_spec: PipSpec, pypi_fallback: bool = False):
         pip_spec = PipSpec(
             name=parts[0], version=(parts[1] if len(parts) == 2 else None)
         )
-    try:
-        pkg = next(
-            p for p in pkg_resources.working_set if p.project_name == pip_spec.name
-        )
-    except StopIteration:
+    dist = _installed_distributions().get(_normalise_pkg_name(pip_spec.name))
+    if dist is None:
         if pypi_fallback:
             logger.info(
                 f"Did not find local installation of package {pip_spec.name} "
                 "falling back to installation from PyPI"
             )
             return pip_spec
+        dist_names = (
+            (k, d.metadata["Name"]) for k, d in _installed_distributions().items()
+        )
         raise ArcanaBuildError(
-            f"Did not find {pip_spec.name} in installed working set:\n"
-            + "\n".join(
-                sorted(p.key + "/" + p.project_name for p in pkg_resources.working_set)
-            )
+            f"Did not find {pip_spec.name} in installed distributions:\n"
+            + "\n".join(sorted(k + "/" + n for k, n in dist_names if n is not None))
         )
     if (
         pip_spec.version
         and (
-            not (pkg.version.endswith(".dirty") or pip_spec.version.endswith(".dirty"))
+            not (dist.version.endswith(".dirty") or pip_spec.version.endswith(".dirty"))
         )
-        and pkg.version != pip_spec.version
+        and dist.version != pip_spec.version
     ):
         msg = (
             f"Requested package {pip_spec.name}=={pip_spec.version} does "
-            "not match installed " + pkg.version
+            "not match installed " + dist.version
         )
         if pypi_fallback:
             logger.warning(msg + " falling back to installation from PyPI")
             return pip_spec
         raise ArcanaBuildError(msg)
-    pkg_loc = Path(pkg.location).resolve()
+    pkg_loc = Path(dist.locate_file("")).resolve()
     # Determine whether installed version of requirement is locally
     # installed (and therefore needs to be copied into image) or can
     # be just downloaded from PyPI
-    if pkg_loc not in site_pkg_locs:
+    if pkg_loc not in _site_pkg_locs():
         # Copy package into Docker image and instruct pip to install from
         # that copy
         pip_spec = PipSpec(
@@ -204,10 +348,8 @@ def local_package_location(pip_spec: PipSpec, pypi_fallback: bool = False):
     else:
         # Check to see whether package is installed via "direct URL" instead
         # of through PyPI
-        direct_url_path = Path(pkg.egg_info) / "direct_url.json"
-        if direct_url_path.exists():
-            with open(direct_url_path) as f:
-                url_spec = json.load(f)
+        url_spec = _read_direct_url(_normalise_pkg_name(pip_spec.name))
+        if url_spec is not None:
             url = url_spec["url"]
             vcs_info = url_spec.get(
                 "vcs_info", url_spec
@@ -227,11 +369,67 @@ def local_package_location(pip_spec: PipSpec, pypi_fallback: bool = False):
                 pip_spec = PipSpec(name=pip_spec.name, url=url, extras=pip_spec.extras)
         else:
             pip_spec = PipSpec(
-                name=pip_spec.name, version=pkg.version, extras=pip_spec.extras
+                name=pip_spec.name, version=dist.version, extras=pip_spec.extras
             )
     return pip_spec
 
 
+@lru_cache(maxsize=1)
+def _site_pkg_locs() -> ty.FrozenSet[Path]:
+    """Resolved locations of the site-packages directories, evaluated on first use
+    to avoid resolving them each time the module is imported"""
+    return frozenset(Path(p).resolve() for p in site.getsitepackages())
+
+
+def _installed_distributions() -> ty.Dict[str, importlib_metadata.Distribution]:
+    """Returns the installed distributions keyed by their normalised names. Cached
+    as scanning the installed distributions requires reading the metadata of each
+    one from disk, with the cache invalidated when the search path changes or a
+    distribution is installed into or removed from one of its directories"""
+    path_state = []
+    for path in sys.path:
+        try:
+            mtime = os.stat(path or os.curdir).st_mtime_ns
+        except OSError:
+            mtime = None
+        path_state.append((path, mtime))
+    return _scan_distributions(tuple(path_state))
+
+
+@lru_cache(maxsize=1)
+def _scan_distributions(
+    path_state: ty.Tuple[ty.Tuple[str, ty.Optional[int]], ...]
+) -> ty.Dict[str, importlib_metadata.Distribution]:
+    """Scans the installed distributions, cached on the entries of the search path
+    and their modification times (see `_installed_distributions`)"""
+    # Metadata read from the previously scanned distributions may be stale
+    _read_direct_url.cache_clear()
+    dists = {}
+    for dist in importlib_metadata.distributions():
+        name = dist.metadata["Name"]
+        if name is None:  # skip broken distributions with missing metadata
+            continue
+        # The first distribution found on the path takes precedence
+        dists.setdefault(_normalise_pkg_name(name), dist)
+    return dists
+
+
+@lru_cache(maxsize=None)
+def _read_direct_url(pkg_key: str) -> ty.Optional[ty.Mapping[str, ty.Any]]:
+    """Reads and decodes the "direct_url.json" metadata of an installed
+    distribution (if present), cached until the installed distributions are
+    rescanned. A read-only view is returned as the decoded dictionary is shared
+    between callers"""
+    direct_url = _installed_distributions()[pkg_key].read_text("direct_url.json")
+    if direct_url is None:
+        return None
+    return MappingProxyType(json_loads(direct_url))
+
+
+def _normalise_pkg_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
 def extract_file_from_docker_image(
     image_tag: str, file_path: PosixPath, out_path: Path = None
 ) -> Path:
@@ -316,4 +514,6 @@ def compare_specs(s1, s2, check_version=True):
 
 
 DOCKER_HUB = "docker.io"
-site_pkg_locs = [Path(p).resolve() for p in site.getsitepackages()]
+HEADER_LINES = 64
+# Matches lines that start a top-level key of a YAML mapping
+_TOP_LEVEL_KEY_RE = re.compile(r"[A-Za-z_][\w\-]*\s*:(\s|$)")
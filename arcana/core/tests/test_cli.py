@@ -0,0 +1,18 @@
+import pytest
+from arcana.core.cli import CsvList
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("a,b,c", ["a", "b", "c"]),
+        ("a", ["a"]),
+        ("", []),
+        ("   ", []),
+        (" a , b,c ", ["a", "b", "c"]),
+        ("a,,b,", ["a", "b"]),
+        (["a", "b"], ["a", "b"]),
+    ],
+)
+def test_csv_list(value, expected):
+    assert CsvList().convert(value, None, None) == expected
@@ -1,4 +1,15 @@
-from arcana.core.utils import package_from_module, path2varname, varname2path
+import json
+import math
+import pytest
+from arcana.core.utils import (
+    package_from_module,
+    path2varname,
+    varname2path,
+    pydra_asdict,
+    pydra_collect_modules,
+    json_dumps,
+)
+from arcana.test.tasks import concatenate, concatenate_reverse
 
 
 def test_package_from_module():
@@ -24,3 +35,33 @@ def test_path2varname():
         assert path2varname(path) == varname
         assert varname2path(varname) == path
         assert varname2path(varname2path(path2varname(path2varname(path)))) == path
+
+
+@pytest.mark.parametrize("task_func", [concatenate, concatenate_reverse])
+def test_pydra_collect_modules(task_func):
+    task = task_func(name="a_task")
+    expected = set()
+    pydra_asdict(task, required_modules=expected)
+    required_modules = set()
+    pydra_collect_modules(task, required_modules)
+    assert required_modules == expected
+    assert "arcana.test.tasks" in required_modules
+
+
+@pytest.mark.parametrize("indent", [False, True])
+def test_json_dumps(indent):
+    dct = {
+        "none": None,
+        "null": "null",
+        "nested": {"null": [1, None, "null"]},
+        "float": 1.5,
+    }
+    assert json.loads(json_dumps(dct, indent=indent)) == dct
+    # Non-finite floats are written in the same way as the standard library
+    for value in (math.nan, math.inf, -math.inf):
+        encoded = json_dumps({"a": [1.0, value]}, indent=indent)
+        assert encoded == json.dumps(
+            {"a": [1.0, value]}, indent=2 if indent else None
+        ).encode()
+    # Non-str keys are converted to strings like the standard library
+    assert json.loads(json_dumps({1: "a"}, indent=indent)) == {"1": "a"}
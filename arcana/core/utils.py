@@ -4,6 +4,7 @@ import subprocess as sp
 import importlib_metadata
 import pkgutil
 import json
+import math
 import typing as ty
 from enum import Enum
 from copy import copy
@@ -25,12 +26,76 @@ from pydra.engine.task import FunctionTask
 from pydra.engine.specs import BaseSpec, SpecInfo
 from arcana.exceptions import ArcanaUsageError
 
+# Use orjson to read and write JSON where it is installed as it is considerably
+# faster than the standard library (both operate on bytes here)
+try:
+    from orjson import (  # noqa: F401 (json_loads is re-exported)
+        loads as json_loads,
+        dumps as orjson_dumps,
+        OPT_INDENT_2,
+    )
+except ImportError:
+    from json import loads as json_loads  # noqa: F401
+
+    orjson_dumps = None
+
 # Avoid arcana.__version__ causing a circular import
 from arcana._version import get_versions
 
 __version__ = get_versions()["version"]
 del get_versions
 
+__all__ = [
+    "__version__",
+    "PIPELINE_ANNOTATIONS",
+    "CONVERTER_ANNOTATIONS",
+    "SWICTH_ANNOTATIONS",
+    "CHECK_ANNOTATIONS",
+    "ARCANA_SPEC",
+    "PATH_SUFFIX",
+    "FIELD_SUFFIX",
+    "CHECKSUM_SUFFIX",
+    "ARCANA_HOME_DIR",
+    "ARCANA_PIP",
+    "get_home_dir",
+    "get_config_file_path",
+    "PATH_ESCAPES",
+    "PATH_NAME_PREFIX",
+    "EMPTY_PATH_NAME",
+    "path2varname",
+    "varname2path",
+    "func_task",
+    "set_loggers",
+    "class_location",
+    "resolve_class",
+    "submodules",
+    "list_subclasses",
+    "set_cwd",
+    "dir_modtime",
+    "json_loads",
+    "json_dumps",
+    "parse_value",
+    "iscontainer",
+    "find_mismatch",
+    "wrap_text",
+    "classproperty",
+    "package_from_module",
+    "pkg_versions",
+    "asdict",
+    "fromdict",
+    "extract_import_re",
+    "NOTHING_STR",
+    "pydra_asdict",
+    "pydra_collect_modules",
+    "lazy_field_fromdict",
+    "pydra_fromdict",
+    "pydra_eq",
+    "show_workflow_errors",
+    "MIN_SERIAL_VERSION",
+    "package_dir",
+    "JSON_ENCODING",
+]
+
 
 PIPELINE_ANNOTATIONS = "__arcana_pipeline__"
 CONVERTER_ANNOTATIONS = "__arcana_converter__"
@@ -356,6 +421,43 @@ def dir_modtime(dpath):
     return max(os.path.getmtime(d) for d, _, _ in os.walk(dpath))
 
 
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """Encodes an object to JSON bytes, falling back to the standard library
+    where orjson wouldn't produce the same output. orjson rejects float
+    subclasses (e.g. numpy.float64) and non-str keys, and writes NaN and
+    infinity as null instead of NaN/Infinity like the standard library
+
+    Parameters
+    ----------
+    obj : ty.Any
+        the object to encode
+    indent : bool
+        whether to indent the output by two spaces
+
+    Returns
+    -------
+    bytes
+        the encoded JSON
+    """
+    if orjson_dumps is not None and not _contains_non_finite(obj):
+        try:
+            return orjson_dumps(obj, option=OPT_INDENT_2 if indent else None)
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def _contains_non_finite(obj) -> bool:
+    """Whether an object to be encoded to JSON contains a NaN or infinite float"""
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_contains_non_finite(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return any(_contains_non_finite(v) for v in obj)
+    return False
+
+
 # def parse_single_value(value, format=None):
 #     """
 #     Tries to convert to int, float and then gives up and assumes the value
@@ -771,14 +873,7 @@ def pydra_asdict(
             func = cp.loads(obj.inputs._func)
             module = inspect.getmodule(func)
             dct["class"] = "<" + module.__name__ + ":" + func.__name__ + ">"
-            required_modules.add(module.__name__)
-            # inspect source for any import lines (should be present in function
-            # not module)
-            for line in inspect.getsourcelines(func)[0]:
-                if match := extract_import_re.match(line):
-                    required_modules.add(match.group(1))
-            # TODO: check source for references to external modules that aren't
-            #       imported within function
+            _add_function_modules(func, required_modules)
         elif type(obj).__module__ != "pydra.engine.task":
             pkg = package_from_module(type(obj).__module__)
             dct["package"] = pkg.key
@@ -802,6 +897,36 @@ def pydra_asdict(
     return dct
 
 
+def pydra_collect_modules(obj: TaskBase, required_modules: ty.Set[str]):
+    """Collects the modules required to load a Pydra Task/Workflow back from disk
+    and run it, i.e. the modules that would be added to `required_modules` by
+    `pydra_asdict`, without building the dictionary representation
+
+    Parameters
+    ----------
+    obj : pydra.engine.core.TaskBase
+        the Pydra object to collect the required modules of
+    required_modules : set[str]
+        the set to add the required modules to
+    """
+    if isinstance(obj, Workflow):
+        for node in obj.nodes:
+            pydra_collect_modules(node, required_modules)
+    elif isinstance(obj, FunctionTask):
+        _add_function_modules(cp.loads(obj.inputs._func), required_modules)
+
+
+def _add_function_modules(func, required_modules: ty.Set[str]):
+    required_modules.add(inspect.getmodule(func).__name__)
+    # inspect source for any import lines (should be present in function
+    # not module)
+    for line in inspect.getsourcelines(func)[0]:
+        if match := extract_import_re.match(line):
+            required_modules.add(match.group(1))
+    # TODO: check source for references to external modules that aren't
+    #       imported within function
+
+
 def lazy_field_fromdict(dct: dict, workflow: Workflow):
     """Unserialises a LazyField object from a dictionary"""
     if "pydra_task" in dct:
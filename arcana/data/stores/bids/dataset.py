@@ -1,11 +1,14 @@
+import os
 import attrs
-import json
 import typing as ty
 from dataclasses import dataclass
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
 from arcana import __version__
 from arcana.__about__ import PACKAGE_NAME, CODE_URL
 from arcana.core.data.set import Dataset
+from arcana.core.utils import json_loads, json_dumps
 from arcana.data.spaces.medimage import Clinical
 from arcana.exceptions import ArcanaError, ArcanaEmptyDatasetError
 from .structure import Bids
@@ -127,7 +130,7 @@ class BidsDataset(Dataset):
 
     @classmethod
     def load(cls, path):
-        if list(Path(path).glob("**/sub-*/ses-*")):
+        if _has_sessions(path):
             hierarchy = ["subject", "timepoint"]
         else:
             hierarchy = ["session"]
@@ -227,16 +230,32 @@ class BidsDataset(Dataset):
             dct["GeneratedBy"] = [g.to_dict() for g in self.generated_by]
         if self.sources:
             dct["sourceDatasets"] = [d.to_dict() for d in self.sources]
-        with open(self.root_dir / "dataset_description.json", "w") as f:
-            json.dump(dct, f, indent="    ")
+        # Encoded in one go (with orjson where it is installed) and written in a
+        # single call
+        description_json = json_dumps(dct, indent=True)
+        with open(self.root_dir / "dataset_description.json", "wb") as f:
+            f.write(description_json)
 
+        # The participants table is built in memory and written in a single call
+        col_names = list(next(iter(self.participants.values())).keys())
+        lines = ["\t".join(["participant_id"] + col_names)]
+        # Extract the participant attributes in column order with a single C-level
+        # call. itemgetter returns a bare value instead of a tuple for fewer than
+        # two keys, so those cases are extracted into a tuple directly
+        if len(col_names) > 1:
+            get_attrs = itemgetter(*col_names)
+        else:
+
+            def get_attrs(pcpt_attrs):
+                return tuple(pcpt_attrs[c] for c in col_names)
+
+        lines.extend(
+            "\t".join((pcpt_id,) + get_attrs(pcpt_attrs))
+            for pcpt_id, pcpt_attrs in self.participants.items()
+        )
+        lines.append("")  # trailing newline
         with open(self.root_dir / "participants.tsv", "w") as f:
-            col_names = list(next(iter(self.participants.values())).keys())
-            f.write("\t".join(["participant_id"] + col_names) + "\n")
-            for pcpt_id, pcpt_attrs in self.participants.items():
-                f.write(
-                    "\t".join([pcpt_id] + [pcpt_attrs[c] for c in col_names]) + "\n"
-                )
+            f.write("\n".join(lines))
 
         if self.readme is not None:
             with open(self.root_dir / "README", "w") as f:
@@ -244,23 +263,29 @@ class BidsDataset(Dataset):
 
     def load_metadata(self):
         description_json_path = self.root_dir / "dataset_description.json"
-        if not description_json_path.exists():
+        try:
+            stat = description_json_path.stat()
+        except FileNotFoundError:
             raise ArcanaEmptyDatasetError(
                 f"Could not find a directory at '{self.id}' containing a "
                 "'dataset_description.json' file"
             )
-        with open(description_json_path) as f:
-            dct = json.load(f)
+        # The parsed description is cached between loads of the dataset (e.g. each
+        # time its tree is built), so the lists in it are copied before they are
+        # assigned to the (mutable) attributes
+        dct = _load_description(
+            str(description_json_path), stat.st_mtime_ns, stat.st_size
+        )
         self.name = dct["Name"]
         self.bids_version = dct["BIDSVersion"]
         self.bids_type = dct.get("DatasetType")
         self.license = dct.get("Licence")
-        self.authors = dct.get("Authors", [])
+        self.authors = list(dct.get("Authors", []))
         self.acknowledgements = dct.get("Acknowledgements")
         self.how_to_acknowledge = dct.get("HowToAcknowledge")
-        self.funding = dct.get("Funding", [])
-        self.ethics_approvals = dct.get("EthicsApprovals", [])
-        self.references = dct.get("ReferencesAndLinks", [])
+        self.funding = list(dct.get("Funding", []))
+        self.ethics_approvals = list(dct.get("EthicsApprovals", []))
+        self.references = list(dct.get("ReferencesAndLinks", []))
         self.doi = dct.get("DatasetDOI")
         if self.bids_type == "derivative":
             if "GeneratedBy" not in dct:
@@ -277,14 +302,13 @@ class BidsDataset(Dataset):
 
         self.participants = {}
         with open(self.root_dir / "participants.tsv") as f:
-            cols = f.readline()[:-1].split("\t")
-            while True:
-                line = f.readline()[:-1]
-                if not line:
-                    break
-
-                d = dict(zip(cols, line.split("\t")))
-                self.participants[d.pop("participant_id")] = d
+            lines = f.read().splitlines()
+        cols = lines[0].split("\t")
+        for line in lines[1:]:
+            if not line:
+                break
+            d = dict(zip(cols, line.split("\t")))
+            self.participants[d.pop("participant_id")] = d
 
         readme_path = self.root_dir / "README"
         if readme_path.exists():
@@ -292,3 +316,52 @@ class BidsDataset(Dataset):
                 self.readme = f.read()
         else:
             self.readme = None
+
+
+@lru_cache(maxsize=32)
+def _load_description(path: str, mtime_ns: int, size: int) -> dict:
+    """Loads a 'dataset_description.json' file, caching the result until the file
+    is modified. NB: the returned dictionary is shared between calls so shouldn't
+    be modified
+
+    Parameters
+    ----------
+    path : str
+        path to the description JSON file
+    mtime_ns : int
+        the modification time of the file, used to invalidate the cache
+    size : int
+        the size of the file, used to invalidate the cache on file-systems with
+        coarse modification times
+
+    Returns
+    -------
+    dict
+        the parsed description
+    """
+    with open(path, "rb") as f:
+        return json_loads(f.read())
+
+
+def _has_sessions(path: ty.Union[str, Path]) -> bool:
+    """Checks whether a BIDS dataset has session sub-directories, stopping at the
+    first one found instead of searching the whole tree
+
+    Parameters
+    ----------
+    path : str or Path
+        path to the root of the BIDS dataset
+
+    Returns
+    -------
+    bool
+        whether there is a 'ses-*' directory within any 'sub-*' directory
+    """
+    with os.scandir(path) as subject_entries:
+        for subject_entry in subject_entries:
+            if not (subject_entry.name.startswith("sub-") and subject_entry.is_dir()):
+                continue
+            with os.scandir(subject_entry.path) as entries:
+                if any(e.name.startswith("ses-") and e.is_dir() for e in entries):
+                    return True
+    return False
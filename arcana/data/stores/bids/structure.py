@@ -1,13 +1,16 @@
+import os
 import typing as ty
-import json
 import re
 import logging
 import attrs
 from dataclasses import dataclass
 import jq
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from ..common import FileSystem
+from ..common.file_system import SCAN_MAX_WORKERS
 from arcana.core.data.format import FileGroup
+from arcana.core.utils import json_loads, json_dumps
 from arcana.exceptions import ArcanaUsageError, ArcanaEmptyDatasetError
 
 
@@ -76,13 +79,22 @@ class Bids(FileSystem):
         except ArcanaEmptyDatasetError:
             return
 
-        for subject_id, participant in dataset.participants.items():
+        if dataset.is_multi_session():
+            # The subjects are already enumerated by the participants table, so
+            # their session directories are listed concurrently as it is bound by
+            # the latency of the file-system
+            subject_dirs = [dataset.root_dir / s for s in dataset.participants]
+            with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as executor:
+                all_sess_ids = list(executor.map(_list_sessions, subject_dirs))
+        else:
+            all_sess_ids = None
+        for i, (subject_id, participant) in enumerate(dataset.participants.items()):
             try:
                 explicit_ids = {"group": participant["group"]}
             except KeyError:
                 explicit_ids = {}
-            if dataset.is_multi_session():
-                for sess_id in (dataset.root_dir / subject_id).iterdir():
+            if all_sess_ids is not None:
+                for sess_id in all_sess_ids[i]:
                     dataset.add_leaf([subject_id, sess_id], explicit_ids=explicit_ids)
             else:
                 dataset.add_leaf([subject_id], explicit_ids=explicit_ids)
@@ -91,17 +103,51 @@ class Bids(FileSystem):
         rel_session_path = self.row_path(row)
         root_dir = row.dataset.root_dir
         session_path = root_dir / rel_session_path
-        session_path.mkdir(exist_ok=True)
-        for modality_dir in session_path.iterdir():
+        # NB: the session directory isn't created here (it is created when items
+        # are written to it) so missing session directories are just skipped
+        for modality_dir in self._scan_subdirs(session_path):
             self.find_items_in_dir(modality_dir, row)
-        deriv_dir = root_dir / "derivatives"
-        if deriv_dir.exists():
-            for pipeline_dir in deriv_dir.iterdir():
-                self.find_items_in_dir(pipeline_dir / rel_session_path, row)
+        for pipeline_dir in self._scan_subdirs(root_dir / "derivatives"):
+            self.find_items_in_dir(os.path.join(pipeline_dir, rel_session_path), row)
+
+    @staticmethod
+    def _scan_subdirs(dpath: Path) -> ty.List[str]:
+        """Lists the paths of the (non-hidden) sub-directories of a directory, using
+        the file-type information returned by os.scandir to avoid a stat per entry.
+        The paths are returned as strings, as they are only passed on to other
+        os.scandir calls. Returns an empty list if the directory doesn't exist"""
+        try:
+            entries = os.scandir(dpath)
+        except FileNotFoundError:
+            return []
+        with entries:
+            return [
+                e.path for e in entries if not e.name.startswith(".") and e.is_dir()
+            ]
+
+    def file_group_stem_path(self, file_group, row_path: Path = None):
+        """Path to the file group within the store without extension
+
+        Parameters
+        ----------
+        file_group : FileGroup
+            the file group to return the path for
+        row_path : Path, optional
+            the path of the file group's row relative to the dataset root (as
+            returned by `row_path`), can be passed by callers that have already
+            computed it to avoid it being recomputed
 
-    def file_group_stem_path(self, file_group):
+        Returns
+        -------
+        Path
+            the path to the file group without the extension
+        """
         row = file_group.row
-        fs_path = self.root_dir(row)
+        if row_path is None:
+            row_path = self.row_path(row)
+        # Collect the path components and join them in a single call rather than
+        # building up intermediate Path objects
+        pieces = [self.root_dir(row)]
         parts = file_group.path.split("/")
         if parts[-1] == "":
             parts = parts[:-1]
@@ -116,26 +162,23 @@ class Bids(FileSystem):
                     f"({file_group.path}: {file_group.format})"
                 )
             # append the first to parts of the path before the row ID (e.g. sub-01/ses-02)
-            fs_path = fs_path.joinpath(*parts[:2])
+            pieces.extend(parts[:2])
             parts = parts[2:]
-        fs_path /= self.row_path(row)
+        pieces.append(row_path)
         if parts:  # The whole derivatives directories can be the output for a BIDS app
-            for part in parts[:-1]:
-                fs_path /= part
-            fname = (
-                "_".join(row.ids[h] for h in row.dataset.hierarchy) + "_" + parts[-1]
-            )
-            fs_path /= fname
-        return fs_path
+            pieces.extend(parts[:-1])
+            pieces.append(row.hierarchy_id + "_" + parts[-1])
+        return Path(*pieces)
 
     def fields_json_path(self, field):
         parts = field.path.split("/")
         if parts[0] != "derivatives":
             assert False, "Non-derivative fields should be taken from participants.tsv"
-        return (
-            field.row.dataset.root_dir.joinpath(parts[:2])
-            / self.row_path(field.row)
-            / self.FIELDS_FNAME
+        return Path(
+            field.row.dataset.root_dir,
+            *parts[:2],
+            self.row_path(field.row),
+            self.FIELDS_FNAME,
         )
 
     def get_field_val(self, field):
@@ -166,41 +209,53 @@ class Bids(FileSystem):
         fs_path : str
             Path of the JSON to potentially edit
         """
-        dct = None
-
-        def lazy_load_json():
-            if dct is not None:
-                return dct
-            else:
-                with open(fs_path) as f:
-                    return json.load(f)
-
         # Ensure there is a value for TaskName for files that include 'task-taskname'
         # in their file path
-        if match := re.match(r".*task-([a-zA-Z]+).*", file_group.path):
-            dct = lazy_load_json()
-            if "TaskName" not in dct:
-                dct["TaskName"] = match.group(1)
-        # Get dictionary containing file paths for all items in the same row
-        # as the file-group so they can be used in the edits using Python
-        # string templating
-        col_paths = {}
-        for col_name, item in file_group.row.items():
-            rel_path = self.file_group_stem_path(item).relative_to(
-                file_group.row.dataset.root_dir / self.row_path(file_group.row)
-            )
-            col_paths[col_name] = str(rel_path) + "." + file_group.ext
-
-        for jedit in self.json_edits:
-            jq_expr = jedit.jq_expr.format(**col_paths)  # subst col file paths
-            if re.match(jedit.path, file_group.path):
-                dct = jq.compile(jq_expr).input(lazy_load_json()).first()
-        # Write dictionary back to file if it has been loaded
-        if dct is not None:
-            with open(fs_path, "w") as f:
-                json.dump(dct, f)
+        task_match = TASK_NAME_RE.search(file_group.path)
+        jedits = [j for j in self.json_edits if re.match(j.path, file_group.path)]
+        if not (task_match or jedits):
+            return  # Avoid reading the file if there is nothing to edit
+        # Read, edit and write the file back through a single file handle
+        with open(fs_path, "r+b") as f:
+            dct = json_loads(f.read())
+            modified = False
+            if task_match and "TaskName" not in dct:
+                dct["TaskName"] = task_match.group(1)
+                modified = True
+            if jedits:
+                # Get dictionary containing file paths for all items in the same
+                # row as the file-group so they can be used in the edits using
+                # Python string templating
+                row = file_group.row
+                row_path = self.row_path(row)
+                row_dir = row.dataset.root_dir / row_path
+                col_paths = {}
+                for col_name, item in row.items():
+                    rel_path = self.file_group_stem_path(
+                        item, row_path=row_path
+                    ).relative_to(row_dir)
+                    col_paths[col_name] = str(rel_path) + "." + file_group.ext
+                for jedit in jedits:
+                    jq_expr = jedit.jq_expr.format(**col_paths)  # subst col file paths
+                    dct = jq.compile(jq_expr).input(dct).first()
+                modified = True
+            if modified:
+                f.seek(0)
+                f.truncate()
+                f.write(json_dumps(dct))
+
+
+def _list_sessions(subject_dir: Path) -> ty.List[str]:
+    """Lists the names of the session ('ses-*') sub-directories of a subject"""
+    with os.scandir(subject_dir) as entries:
+        return [e.name for e in entries if e.name.startswith("ses-") and e.is_dir()]
 
 
 def outputs_converter(outputs):
     """Sets the path of an output to '' if not provided or None"""
-    return [o[:2] + ("",) if len(o) < 3 or o[2] is None else o for o in outputs]
+    return [
+        o if len(o) >= 3 and o[2] is not None else (o[0], o[1], "") for o in outputs
+    ]
+
+
+TASK_NAME_RE = re.compile(r"task-([a-zA-Z]+)")
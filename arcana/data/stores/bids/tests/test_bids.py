@@ -8,10 +8,10 @@ import numpy.random
 import shutil
 from dataclasses import dataclass
 import pytest
-import docker
 from arcana import __version__
 from arcana.data.formats import NiftiX
 from arcana.data.stores.bids import BidsDataset
+from arcana.data.stores.bids.dataset import _has_sessions
 from arcana.tasks.bids.app import bids_app, Input, Output
 from arcana.data.formats.common import Text, Directory
 from arcana.data.formats.medimage import NiftiGzX, NiftiGzXFslgrad
@@ -22,7 +22,9 @@ MOCK_README = "A dummy readme\n" * 100
 MOCK_AUTHORS = ["Dumm Y. Author", "Another D. Author"]
 
 
-def test_bids_roundtrip(bids_validator_docker, bids_success_str, work_dir):
+def test_bids_roundtrip(
+    bids_validator_docker, bids_success_str, work_dir, docker_client
+):
 
     path = work_dir / "bids-dataset"
     name = "bids-dataset"
@@ -77,7 +79,7 @@ def test_bids_roundtrip(bids_validator_docker, bids_success_str, work_dir):
         item.put(dummy_nifti, dummy_json)
 
     # Full dataset validation using dockerized validator
-    dc = docker.from_env()
+    dc = docker_client
     dc.images.pull(bids_validator_docker)
     result = dc.containers.run(
         bids_validator_docker,
@@ -168,6 +170,28 @@ def json_edit_blueprint(request):
     return JSON_EDIT_TESTS[request.param]
 
 
+@pytest.mark.parametrize(
+    "rel_dirs,has_sessions",
+    [
+        (["sub-01/anat", "sub-02/anat"], False),
+        (["sub-01/ses-01/anat", "sub-02/ses-01/anat"], True),
+        # Only the first subject with sessions needs to be found
+        (["sub-01/anat", "sub-02/ses-01/anat"], True),
+        # 'ses-' directories outside of subject directories don't count
+        (["derivatives/ses-01", "sub-01/anat"], False),
+        ([], False),
+    ],
+)
+def test_has_sessions(rel_dirs, has_sessions, work_dir: Path):
+    path = work_dir / "bids-dataset"
+    path.mkdir()
+    for rel_dir in rel_dirs:
+        (path / rel_dir).mkdir(parents=True)
+    # A file named like a session directory isn't a session
+    (path / "ses-file").touch()
+    assert _has_sessions(path) == has_sessions
+
+
 def test_bids_json_edit(json_edit_blueprint: JsonEditBlueprint, work_dir: Path):
 
     bp = json_edit_blueprint  # shorten name
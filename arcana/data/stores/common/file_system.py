@@ -7,7 +7,7 @@ from collections import defaultdict
 import shutil
 import typing as ty
 import logging
-import json
+from concurrent.futures import ThreadPoolExecutor
 import attrs
 import yaml
 from fasteners import InterProcessLock
@@ -16,11 +16,11 @@ from arcana.core.data.set import Dataset
 from arcana.data.spaces.medimage import Clinical, DataSpace
 from arcana.core.data.store import DataStore
 from arcana.core.data.format import FileGroup
+from arcana.core.utils import json_loads, json_dumps
 
 
 logger = logging.getLogger("arcana")
 
-
 # Matches directory names used for summary rows with dunder beginning and
 # end (e.g. '__visit_01__') and hidden directories (i.e. starting with '.' or
 # '~')
@@ -50,6 +50,10 @@ class FileSystem(DataStore):
     VALUE_KEY = "__value__"
     METADATA_DIR = ".arcana"
 
+    _pending_fields = attrs.field(
+        factory=dict, init=False, hash=False, repr=False, eq=False
+    )
+
     def new_dataset(self, id, *args, **kwargs):
         if not Path(id).exists():
             raise ArcanaUsageError(f"Path to dataset root '{id}'' does not exist")
@@ -80,10 +84,16 @@ class FileSystem(DataStore):
         # Don't need to cache file_group as it is already local as long
         # as the path is set
         stem_path = self.file_group_stem_path(file_group)
-        # Get all paths that match the stem path (but with different extensions)
-        matches = [
-            p for p in stem_path.parent.iterdir() if str(p).startswith(str(stem_path))
-        ]
+        # Get all paths that match the stem path (but with different extensions),
+        # which are all found by a single listing of the parent directory instead
+        # of checking for each candidate path
+        stem_name = stem_path.name
+        with os.scandir(stem_path.parent) as entries:
+            matches = [
+                stem_path.with_name(e.name)
+                for e in entries
+                if e.name.startswith(stem_name)
+            ]
         if not matches:
             raise ArcanaMissingDataException(
                 f"No files/sub-dirs matching '{file_group.path}' path found in "
@@ -114,6 +124,7 @@ class FileSystem(DataStore):
         # Create target directory if it doesn't exist already
         stem_path.parent.mkdir(exist_ok=True, parents=True)
         cached_paths = []
+        to_copy = []
         for fs_path in fs_paths:
             if fs_path.is_dir():
                 target_path = stem_path
@@ -122,8 +133,19 @@ class FileSystem(DataStore):
                 shutil.copytree(fs_path, target_path)
             else:
                 target_path = file_group.copy_ext(fs_path, stem_path)
-                shutil.copyfile(str(fs_path), str(target_path))
+                to_copy.append((str(fs_path), str(target_path)))
             cached_paths.append(target_path)
+        # Copy the primary and side-car files of the file group concurrently, as
+        # the copies are performed in the kernel (with the GIL released) by
+        # shutil.copyfile. The pool is created per call as stores can be used
+        # from forked worker processes
+        if len(to_copy) > 1:
+            with ThreadPoolExecutor(
+                max_workers=min(len(to_copy), COPY_MAX_WORKERS)
+            ) as executor:
+                list(executor.map(shutil.copyfile, *zip(*to_copy)))
+        elif to_copy:
+            shutil.copyfile(*to_copy[0])
         return cached_paths
 
     def file_group_stem_path(self, file_group):
@@ -141,36 +163,74 @@ class FileSystem(DataStore):
 
     def put_field_value(self, field, value):
         """
-        Inserts or updates a field in the store
+        Inserts or updates a field in the store. Within a "with <store>" block (e.g.
+        when sinking the outputs of a pipeline), the fields are buffered and written
+        to each fields JSON together when the block exits, or discarded if it exits
+        with an exception
         """
-        fpath = self.fields_json_path(field)
-        # Open fields JSON, locking to prevent other processes
-        # reading or writing
+        fpath = str(self.fields_json_path(field))
+        if field.array:
+            value = list(value)
+        entry = {
+            self.VALUE_KEY: value,
+            self.PROV_KEY: field.provenance.dct,
+        }
+        if self._connection_depth:
+            self._pending_fields.setdefault(fpath, {})[field.path] = entry
+        else:
+            self._write_fields(fpath, {field.path: entry})
+
+    def _write_fields(self, fpath: str, entries: ty.Dict[str, dict]):
+        """Merges the given entries into a fields JSON file"""
+        # Open fields JSON, locking to prevent other processes writing to it
+        # between it being read and replaced
         with InterProcessLock(fpath + self.LOCK_SUFFIX, logger=logger):
             try:
-                with open(fpath, "r") as f:
-                    dct = json.load(f)
+                with open(fpath, "rb") as f:
+                    dct = json_loads(f.read())
             except IOError as e:
                 if e.errno == errno.ENOENT:
                     dct = {}
                 else:
                     raise
-            if field.array:
-                value = list(value)
-            dct[field.path] = {
-                self.VALUE_KEY: value,
-                self.PROV_KEY: field.provenance.dct,
-            }
-            with open(fpath, "w") as f:
-                json.dump(dct, f, indent=2)
+            dct.update(entries)
+            # Write to a temporary file and then move it into place so the fields
+            # JSON isn't left partially written if the process is interrupted
+            tmp_path = fpath + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(json_dumps(dct, indent=True))
+            os.replace(tmp_path, fpath)
+
+    def disconnect(self):
+        """
+        Writes the fields buffered within the "with <store>" block, taking the lock
+        on and rewriting each fields JSON once
+        """
+        pending, self._pending_fields = self._pending_fields, {}
+        for fpath, entries in pending.items():
+            self._write_fields(fpath, entries)
+        super().disconnect()
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        # Only persist the buffered fields if the outermost "with <store>" block
+        # completes, so a failed sink doesn't leave partially written values
+        if exception_type is not None and self._connection_depth == 1:
+            if self._pending_fields:
+                logger.warning(
+                    "Discarding field values buffered by %s as the block raised %s",
+                    self,
+                    exception_type.__name__,
+                )
+            self._pending_fields = {}
+        super().__exit__(exception_type, exception_value, traceback)
 
     def put_provenance(self, item, provenance):
-        with open(self.prov_json_path(item), "w") as f:
-            json.dump(provenance, f)
+        with open(self.prov_json_path(item), "wb") as f:
+            f.write(json_dumps(provenance, indent=True))
 
     def get_provenance(self, item):
-        with open(self.prov_json_path(item)) as f:
-            provenance = json.load(f)
+        with open(self.prov_json_path(item), "rb") as f:
+            provenance = json_loads(f.read())
         return provenance
 
     def find_rows(self, dataset: Dataset):
@@ -189,12 +249,22 @@ class FileSystem(DataStore):
                 "root row of the dataset"
             )
 
-        for dpath, _, _ in os.walk(dataset.id):
-            tree_path = Path(dpath).relative_to(dataset.id).parts
-            if len(tree_path) != len(dataset.hierarchy):
-                continue
-            if special_dir_re.match(tree_path[-1]):
-                continue
+        # Only the sub-directories down to the depth of the hierarchy need to be
+        # scanned, so instead of walking the whole tree (including the contents of
+        # the leaf directories) the scan stops at the leaves and skips summary and
+        # hidden directories. Each layer of directories is listed concurrently, as
+        # listing them is bound by the latency of the file-system, while the leaves
+        # are added to the dataset serially
+        layer_dirs = [(dataset.id, ())]
+        with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as executor:
+            for _ in dataset.hierarchy:
+                sub_dirs = executor.map(_list_sub_dirs, (d for d, _ in layer_dirs))
+                layer_dirs = [
+                    (sub_dpath, tree_path + (name,))
+                    for (_, tree_path), listing in zip(layer_dirs, sub_dirs)
+                    for name, sub_dpath in listing
+                ]
+        for _, tree_path in layer_dirs:
             dataset.add_leaf(tree_path)
 
     def find_items(self, row):
@@ -202,82 +272,111 @@ class FileSystem(DataStore):
         self.find_items_in_dir(self.root_dir(row) / self.row_path(row), row)
 
     def find_items_in_dir(self, dpath, row):
-        if not op.exists(dpath):
+        # Filter contents of directory to omit fields JSON and provenance, noting
+        # which of them are present so they don't need to be checked for separately,
+        # and group files and sub-dirs that match except for extensions (directory
+        # entries are unique so they don't need to be deduplicated)
+        matching = defaultdict(list)
+        prov_fnames = set()
+        has_fields = False
+        prov_suffix = self.PROV_SUFFIX
+        fields_fname = self.FIELDS_FNAME
+        try:
+            with os.scandir(dpath) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if name[0] == ".":
+                        continue
+                    if name == fields_fname:
+                        has_fields = True
+                    elif name.endswith(prov_suffix):
+                        prov_fnames.add(name)
+                    else:
+                        matching[name.partition(".")[0]].append(name)
+        except FileNotFoundError:
             return
-        # Filter contents of directory to omit fields JSON and provenance
-        filtered = []
-        for subpath in dpath.iterdir():
-            if not (
-                subpath.name.startswith(".")
-                or subpath.name == self.FIELDS_FNAME
-                or subpath.name.endswith(self.PROV_SUFFIX)
-            ):
-                filtered.append(subpath.name)
-        # Group files and sub-dirs that match except for extensions
-        matching = defaultdict(set)
-        for fname in filtered:
-            basename = fname.split(".")[0]
-            matching[basename].add(fname)
+        # Paths to the entries are built by concatenating their names to the
+        # directory prefix, which is cheaper than joining them one by one
+        dir_prefix = op.join(dpath, "")
         # Add file groups
         for bname, fnames in matching.items():
-            prov_path = dpath / (bname + self.PROV_SUFFIX)
-            if prov_path.exists():
-                with open(prov_path) as f:
-                    provenance = json.load(f)
+            prov_fname = bname + prov_suffix
+            if prov_fname in prov_fnames:
+                with open(dir_prefix + prov_fname, "rb") as f:
+                    provenance = json_loads(f.read())
             else:
                 provenance = {}
             row.add_file_group(
                 path=bname,
-                file_paths=[op.join(dpath, f) for f in fnames],
+                file_paths=[dir_prefix + f for f in fnames],
                 provenance=provenance,
             )
         # Add fields
-        try:
-            with open(op.join(dpath, self.FIELDS_FNAME), "r") as f:
-                dct = json.load(f)
-        except FileNotFoundError:
-            pass
-        else:
+        if has_fields:
+            with open(dir_prefix + fields_fname, "rb") as f:
+                dct = json_loads(f.read())
             for name, value in dct.items():
                 if isinstance(value, dict):
                     prov = value[self.PROV_KEY]
                     value = value[self.VALUE_KEY]
                 else:
                     prov = None
-                row.add_field(name_path=name, value=value, provenance=prov)
+                row.add_field(path=name, value=value, provenance=prov)
+
+    def row_path(self, row) -> Path:
+        """The path to the row relative to the root of the dataset. Cached on the
+        row as it only depends on its IDs and is required whenever an item of the
+        row is accessed
 
-    def row_path(self, row):
-        path = Path()
+        Parameters
+        ----------
+        row : DataRow
+            the row to return the path of
+
+        Returns
+        -------
+        Path
+            the relative path to the row
+        """
+        path = row._path_cache
+        if path is None:
+            path = row._path_cache = Path(*self._row_path_parts(row))
+        return path
+
+    def _row_path_parts(self, row) -> ty.List[str]:
+        parts = []
         accounted_freq = row.dataset.space(0)
         for layer in row.dataset.hierarchy:
             if not (layer.is_parent(row.frequency) or layer == row.frequency):
                 break
-            path /= row.ids[layer]
+            parts.append(row.ids[layer])
             accounted_freq |= layer
         # If not "leaf row" then
         if row.frequency != max(row.dataset.space):
             unaccounted_freq = (row.frequency ^ accounted_freq) & row.frequency
             unaccounted_id = row.ids[unaccounted_freq]
             if unaccounted_id is None:
-                path /= f"__{unaccounted_freq}__"
+                parts.append(f"__{unaccounted_freq}__")
             elif isinstance(unaccounted_id, str):
-                path /= f"__{unaccounted_freq}_{unaccounted_id}__"
+                parts.append(f"__{unaccounted_freq}_{unaccounted_id}__")
             else:
-                path /= f"__{unaccounted_freq}_" + "_".join(unaccounted_id) + "__"
-        return path
+                parts.append(f"__{unaccounted_freq}_" + "_".join(unaccounted_id) + "__")
+        return parts
 
     def root_dir(self, row) -> Path:
         return Path(row.dataset.id)
 
     @classmethod
     def absolute_row_path(cls, row) -> Path:
-        return cls().root_dir(row) / cls().row_path(row)
+        store = cls()
+        return store.root_dir(row) / store.row_path(row)
 
     def fields_json_path(self, field):
         return self.root_dir(field.row) / self.row_path(field.row) / self.FIELDS_FNAME
 
     def prov_json_path(self, file_group):
-        return self.file_group_path(file_group) + self.PROV_SUFFX
+        stem_path = self.file_group_stem_path(file_group)
+        return stem_path.with_name(stem_path.name + self.PROV_SUFFIX)
 
     # def get_provenance(self, item):
     #     if item.is_file_group:
@@ -311,18 +410,21 @@ class FileSystem(DataStore):
 
     def get_field_val(self, field):
         """
-        Load fields JSON, locking to prevent read/write conflicts
-        Would be better if only checked if locked to allow
-        concurrent reads but not possible with multi-process
-        locks (in my understanding at least).
+        Load fields JSON. Writers replace the file atomically (see `_write_fields`),
+        so it is always complete and doesn't need to be locked to be read, allowing
+        concurrent reads. The lock is only taken by writers to serialise their
+        read-modify-write cycles.
         """
         json_path = self.fields_json_path(field)
+        # Values that have been put but not written yet
         try:
-            with InterProcessLock(json_path + self.LOCK_SUFFIX, logger=logger), open(
-                json_path, "r"
-            ) as f:
-                dct = json.load(f)
-            val_dct = dct[field.name]
+            return self._pending_fields[str(json_path)][field.path]
+        except KeyError:
+            pass
+        try:
+            with open(json_path, "rb") as f:
+                dct = json_loads(f.read())
+            val_dct = dct[field.path]
             return val_dct
         except (KeyError, IOError) as e:
             try:
@@ -333,10 +435,21 @@ class FileSystem(DataStore):
             except AttributeError:
                 pass
             raise ArcanaMissingDataException(
-                "{} does not exist in the local store {}".format(field.name, self)
+                "{} does not exist in the local store {}".format(field.path, self)
             )
 
 
+def _list_sub_dirs(dpath: str) -> ty.List[ty.Tuple[str, str]]:
+    """Lists the names and paths of the sub-directories of a directory, omitting
+    summary and hidden directories"""
+    with os.scandir(dpath) as entries:
+        return [
+            (e.name, e.path)
+            for e in entries
+            if not special_dir_re.match(e.name) and e.is_dir()
+        ]
+
+
 def single_dataset(
     path: str, tree_dimensions: DataSpace = Clinical, **kwargs
 ) -> Dataset:
@@ -355,3 +468,7 @@ def single_dataset(
     return FileSystem(op.join(path, ".."), **kwargs).dataset(
         op.basename(path), tree_dimensions
     )
+
+
+COPY_MAX_WORKERS = 4
+SCAN_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
@@ -1,10 +1,13 @@
 import os
 import os.path
+import json
+import pytest
 from tempfile import mkdtemp
 import hashlib
 from pathlib import Path
 import operator as op
 from functools import reduce
+from types import SimpleNamespace
 from arcana.core.data.set import Dataset
 from arcana.test.datasets import create_test_file
 
@@ -79,3 +82,30 @@ def test_put_items(dataset: Dataset):
     check_inserted()  # Check that cached objects have been updated
     dataset.refresh()  # Clear object cache
     check_inserted()  # Check that objects can be recreated from store
+
+
+def test_put_field_within_connection(dataset: Dataset):
+    store = dataset.store
+    row = next(iter(dataset.rows(dataset.leaf_freq)))
+    field = SimpleNamespace(
+        path="deriv/a_field",
+        row=row,
+        array=False,
+        provenance=SimpleNamespace(dct={}),
+    )
+    fields_json = store.fields_json_path(field)
+    with store:
+        store.put_field_value(field, 42)
+        # The value is buffered until the connection is closed but is still
+        # visible to reads made within it
+        assert not fields_json.exists()
+        assert store.get_field_val(field)[store.VALUE_KEY] == 42
+    with open(fields_json) as f:
+        assert json.load(f)[field.path][store.VALUE_KEY] == 42
+    assert store.get_field_val(field)[store.VALUE_KEY] == 42
+    # Values put within a block that raises an exception aren't written
+    with pytest.raises(RuntimeError):
+        with store:
+            store.put_field_value(field, 43)
+            raise RuntimeError("sink failed")
+    assert store.get_field_val(field)[store.VALUE_KEY] == 42
@@ -311,6 +311,8 @@ CONTAINER_DERIV_PATH = "/arcana_bids_outputs"
 CONTAINER_DATASET_PATH = "/arcana_bids_dataset"
 
 DEFAULT_BIDS_ID = "sub-DEFAULT"
+# Characters that aren't permitted in BIDS IDs
+NON_ALPHANUM_RE = re.compile(r"[^a-zA-Z0-9]")
 
 
 @mark.task
@@ -319,7 +321,7 @@ def bidsify_id(id):
     if id == attrs.NOTHING:
         id = DEFAULT_BIDS_ID
     else:
-        id = re.sub(r"[^a-zA-Z0-9]", "", id)
+        id = NON_ALPHANUM_RE.sub("", id)
         if not id.startswith("sub-"):
             id = "sub-" + id
     return id, id[len("sub-") :]
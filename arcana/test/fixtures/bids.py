@@ -1,4 +1,7 @@
 import os
+import hashlib
+from pathlib import Path
+from tempfile import TemporaryDirectory
 import pytest
 import docker
 from arcana.data.formats.medimage import NiftiGzX
@@ -9,6 +12,7 @@ BIDS_VALIDATOR_DOCKER = "bids/validator:latest"
 SUCCESS_STR = "This dataset appears to be BIDS compatible"
 MOCK_BIDS_APP_IMAGE = "arcana-mock-bids-app"
 BIDS_VALIDATOR_APP_IMAGE = "arcana-bids-validator-app"
+BUILD_HASH_LABEL = "arcana.test-build-hash"
 
 
 @pytest.fixture(scope="session")
@@ -78,55 +82,78 @@ def bids_success_str():
 
 
 @pytest.fixture(scope="session")
-def bids_validator_docker():
-    dc = docker.from_env()
-    dc.images.pull(BIDS_VALIDATOR_DOCKER)
+def bids_validator_docker(docker_client):
+    docker_client.images.pull(BIDS_VALIDATOR_DOCKER)
     return BIDS_VALIDATOR_DOCKER
 
 
 @pytest.fixture(scope="session")
 def bids_validator_app_image(
-    bids_validator_app_script, bids_validator_docker, build_cache_dir
+    bids_validator_app_script, bids_validator_docker, build_cache_dir, docker_client
 ):
     return build_app_image(
         BIDS_VALIDATOR_APP_IMAGE,
         bids_validator_app_script,
         build_cache_dir,
         base_image=bids_validator_docker,
+        dc=docker_client,
     )
 
 
 @pytest.fixture(scope="session")
-def mock_bids_app_image(mock_bids_app_script, build_cache_dir):
+def mock_bids_app_image(mock_bids_app_script, build_cache_dir, docker_client):
     return build_app_image(
         MOCK_BIDS_APP_IMAGE,
         mock_bids_app_script,
         build_cache_dir,
         base_image=DEFAULT_BASE_IMAGE,
+        dc=docker_client,
     )
 
 
-def build_app_image(tag_name, script, build_cache_dir, base_image):
-    dc = docker.from_env()
+def build_app_image(tag_name, script, build_cache_dir, base_image, dc):
 
-    # Create executable that runs validator then produces some mock output
-    # files
-    build_dir = build_cache_dir / tag_name.replace(":", "__i__")
-    build_dir.mkdir()
-    launch_sh = build_dir / "launch.sh"
-    with open(launch_sh, "w") as f:
-        f.write(script)
-
-    # Build mock BIDS app image
-    with open(build_dir / "Dockerfile", "w") as f:
-        f.write(
-            f"""FROM {base_image}
+    dockerfile = f"""FROM {base_image}
 ADD ./launch.sh /launch.sh
 RUN chmod +x /launch.sh
 ENTRYPOINT ["/launch.sh"]"""
-        )
 
-    dc.images.build(path=str(build_dir), tag=tag_name)
+    # Skip the build if the image has already been built (e.g. in a previous test
+    # session) from the same script, Dockerfile and base image
+    try:
+        base_image_id = dc.images.get(base_image).id
+    except docker.errors.ImageNotFound:
+        base_image_id = base_image
+    build_hash = hashlib.blake2b(
+        "\n".join((base_image_id, dockerfile, script)).encode(), digest_size=8
+    ).hexdigest()
+    try:
+        image = dc.images.get(tag_name)
+    except docker.errors.ImageNotFound:
+        pass
+    else:
+        if image.labels.get(BUILD_HASH_LABEL) == build_hash:
+            return tag_name
+
+    # The build context is only required for the duration of the build, so it is
+    # created in a uniquely named temporary directory that doesn't clash with
+    # other test sessions and is cleaned up afterwards
+    with TemporaryDirectory(
+        prefix=tag_name.replace(":", "__i__") + "-", dir=build_cache_dir
+    ) as build_dir:
+        build_dir = Path(build_dir)
+        # Create executable that runs validator then produces some mock output
+        # files
+        with open(build_dir / "launch.sh", "w") as f:
+            f.write(script)
+
+        # Build mock BIDS app image
+        with open(build_dir / "Dockerfile", "w") as f:
+            f.write(dockerfile)
+
+        dc.images.build(
+            path=str(build_dir), tag=tag_name, labels={BUILD_HASH_LABEL: build_hash}
+        )
 
     return tag_name
 
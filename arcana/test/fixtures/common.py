@@ -253,13 +253,20 @@ def command_spec():
 
 
 @pytest.fixture(scope="session")
-def docker_registry():
+def docker_client():
+    # A single Docker client shared between all the fixtures and tests that
+    # need one, rather than each connecting to the daemon separately
+    return docker.from_env()
+
+
+@pytest.fixture(scope="session")
+def docker_registry(docker_client):
 
     IMAGE = "docker.io/registry"
     PORT = "5557"
     CONTAINER = "test-docker-registry"
 
-    dc = docker.from_env()
+    dc = docker_client
     try:
         image = dc.images.get(IMAGE)
     except docker.errors.ImageNotFound:
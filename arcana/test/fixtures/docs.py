@@ -161,8 +161,7 @@ weight: 10
 ### Required licenses
 |Source file|Info|
 |-----------|----|
-|`freesurfer.txt`|license description
-|
+|`freesurfer.txt`|license description |
 
 ## Commands
 ### mriqc
@@ -18,6 +18,7 @@ from arcana.test.stores.medimage.xnat import (
     create_dataset_data_in_repo,
     make_project_id,
     access_dataset,
+    shared_login,
 )
 from arcana.test.datasets import save_dataset as save_file_system_dataset
 
@@ -119,19 +120,34 @@ MUTABLE_DATASETS = ["basic.api", "multi.api", "basic.cs", "multi.cs"]
 
 @pytest.fixture(params=GOOD_DATASETS, scope="session")
 def xnat_dataset(xnat_repository, xnat_archive_dir, request):
+    # Pytest can tear down and set up parametrized session-scoped fixtures
+    # multiple times depending on the order the tests are run in, so the datasets
+    # are cached to avoid having to access them again
+    try:
+        return _xnat_datasets[request.param]
+    except KeyError:
+        pass
     dataset_id, access_method = request.param.split(".")
     blueprint = TEST_XNAT_DATASET_BLUEPRINTS[dataset_id]
     run_prefix = xnat_repository.__annotations__["run_prefix"]
-    with xnat4tests.connect() as login:
-        if make_project_id(dataset_id, run_prefix) not in login.projects:
-            create_dataset_data_in_repo(dataset_id, blueprint, run_prefix)
-    return access_dataset(
+    # Query the project directly instead of listing all projects on the server
+    response = shared_login().get(
+        f"/data/archive/projects/{make_project_id(dataset_id, run_prefix)}",
+        accepted_status=[200, 404],
+    )
+    if response.status_code != 200:
+        create_dataset_data_in_repo(dataset_id, blueprint, run_prefix)
+    dataset = _xnat_datasets[request.param] = access_dataset(
         dataset_id=dataset_id,
         blueprint=blueprint,
         xnat_repository=xnat_repository,
         xnat_archive_dir=xnat_archive_dir,
         access_method=access_method,
     )
+    return dataset
+
+
+_xnat_datasets = {}
 
 
 @pytest.fixture(params=MUTABLE_DATASETS, scope="function")
@@ -1,10 +1,18 @@
+import sys
 import typing as ty
 import time
 from pathlib import Path
-import random
+from secrets import token_hex
+import atexit
+import threading
+import io
+import zipfile
 from dataclasses import dataclass
-from tempfile import mkdtemp
+from tempfile import mkdtemp, TemporaryDirectory
 from itertools import product
+from collections import defaultdict
+from functools import partial, lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import xnat
 import xnat4tests
 from arcana.data.stores.medimage.xnat.api import Xnat
@@ -14,37 +22,60 @@ from arcana.test.datasets import create_test_file
 from arcana.exceptions import ArcanaError
 
 
-@dataclass
+# NB: the blueprints are frozen, with any sequences passed to them converted to
+# tuples, so they are hashable and can be used as keys to cache the data
+# generated from them
+
+
+@dataclass(frozen=True)
 class ResourceBlueprint:
 
     name: str
     format: type
-    filenames: ty.List[str]
+    filenames: ty.Tuple[str, ...]
+
+    def __post_init__(self):
+        object.__setattr__(self, "filenames", tuple(self.filenames))
 
 
-@dataclass
+@dataclass(frozen=True)
 class ScanBlueprint:
 
     name: str
-    resources: ty.List[ResourceBlueprint]
+    resources: ty.Tuple[ResourceBlueprint, ...]
 
+    def __post_init__(self):
+        object.__setattr__(self, "resources", tuple(self.resources))
 
-@dataclass
+
+@dataclass(frozen=True)
 class DerivBlueprint:
 
     name: str
     row_frequency: Clinical
     format: type
-    filenames: ty.List[str]
+    filenames: ty.Tuple[str, ...]
+
+    def __post_init__(self):
+        object.__setattr__(self, "filenames", tuple(self.filenames))
 
 
-@dataclass
+@dataclass(frozen=True)
 class TestXnatDatasetBlueprint:
 
-    dim_lengths: ty.List[int]
-    scans: ty.List[ScanBlueprint]
-    id_inference: ty.Dict[str, str]
-    derivatives: ty.List[DerivBlueprint]  # files to insert as derivatives
+    dim_lengths: ty.Tuple[int, ...]
+    scans: ty.Tuple[ScanBlueprint, ...]
+    id_inference: ty.Tuple[ty.Tuple[str, str], ...]
+    derivatives: ty.Tuple[DerivBlueprint, ...]  # files to insert as derivatives
+
+    def __post_init__(self):
+        object.__setattr__(self, "dim_lengths", tuple(self.dim_lengths))
+        object.__setattr__(self, "scans", tuple(self.scans))
+        id_inference = self.id_inference
+        if isinstance(id_inference, dict):
+            id_inference = id_inference.items()
+        object.__setattr__(self, "id_inference", tuple(id_inference))
+        object.__setattr__(self, "derivatives", tuple(self.derivatives))
 
 
 def make_mutable_dataset(
@@ -57,7 +88,7 @@ def make_mutable_dataset(
     source_data: Path = None,
 ):
     """Create a dataset (project) in the test XNAT repository"""
-    test_suffix = "mutable" + access_method + str(hex(random.getrandbits(16)))[2:]
+    test_suffix = "mutable" + access_method + token_hex(2)
     run_prefix = xnat_repository.__annotations__["run_prefix"]
     # Need to create a new dataset per function so it can be safely modified
     # by the test without messing up other tests.
@@ -79,8 +110,11 @@ def make_mutable_dataset(
     )
 
 
+@lru_cache(maxsize=128)
 def make_project_id(dataset_name: str, run_prefix: str = None, test_suffix: str = ""):
-    return (run_prefix if run_prefix else "") + dataset_name + test_suffix
+    # Cached (and interned) as the same IDs are regenerated by each fixture and
+    # helper that accesses a project
+    return sys.intern((run_prefix if run_prefix else "") + dataset_name + test_suffix)
 
 
 def access_dataset(
@@ -133,39 +167,172 @@ def create_dataset_data_in_repo(
     """
     proj_name = make_project_id(dataset_name, run_prefix, test_suffix)
 
-    with xnat4tests.connect() as login:
-        login.put(f"/data/archive/projects/{proj_name}")
-
-    with xnat4tests.connect() as login:
-        xproject = login.projects[proj_name]
-        xclasses = login.classes
-        for id_tple in product(*(list(range(d)) for d in blueprint.dim_lengths)):
-            ids = dict(zip(Clinical.axes(), id_tple))
-            # Create subject
-            subject_label = "".join(f"{b}{ids[b]}" for b in Clinical.subject.span())
-            xsubject = xclasses.SubjectData(label=subject_label, parent=xproject)
-            # Create session
-            session_label = "".join(f"{b}{ids[b]}" for b in Clinical.session.span())
-            xsession = xclasses.MrSessionData(label=session_label, parent=xsubject)
-
-            for i, scan in enumerate(blueprint.scans, start=1):
-                # Create scan
-                xscan = xclasses.MrScanData(id=i, type=scan.name, parent=xsession)
-                for resource in scan.resources:
-
-                    tmp_dir = Path(mkdtemp())
-                    # Create the resource
-                    xresource = xscan.create_resource(resource.name)
-                    # Create the dummy files
-                    for fname in resource.filenames:
-                        if source_data is not None:
-                            fpath = source_data.joinpath(*fname.split("/"))
-                            target_fpath = fpath.name
-                        else:
-                            fpath = create_test_file(fname, tmp_dir)
-                            target_fpath = str(fpath)
-                        xresource.upload(str(tmp_dir / fpath), target_fpath)
+    shared_login().put(f"/data/archive/projects/{proj_name}")
+
+    # Group the sessions by subject, so the subjects can be created independently
+    axes = Clinical.axes()
+    subject_span = Clinical.subject.span()
+    session_span = Clinical.session.span()
+    subjects = defaultdict(list)
+    for id_tple in product(*(range(d) for d in blueprint.dim_lengths)):
+        ids = dict(zip(axes, id_tple))
+        subject_label = "".join(f"{b}{ids[b]}" for b in subject_span)
+        session_label = "".join(f"{b}{ids[b]}" for b in session_span)
+        subjects[subject_label].append(session_label)
+
+    # The scans and the zipped resources uploaded to them are the same for every
+    # session, so they are prebuilt once here instead of within the session loop
+    scan_uploads = []
+    for i, scan in enumerate(blueprint.scans, start=1):
+        resource_zips = []
+        for resource in scan.resources:
+            if source_data is not None:
+                fpaths = (
+                    source_data.joinpath(*f.split("/")) for f in resource.filenames
+                )
+                zip_bytes = _zip_in_memory((p.name, p.read_bytes()) for p in fpaths)
+            else:
+                # The dummy files are the same for every dataset and test
+                zip_bytes = _dummy_resource_zip(resource.filenames)
+            resource_zips.append((resource.name, zip_bytes))
+        scan_uploads.append((i, scan.name, resource_zips))
+
+    # Creating the data is bound by the latency of the requests to the XNAT
+    # server, so the subjects are created concurrently (each worker thread using
+    # its own connection)
+    create_subject = partial(
+        _create_subject_data_in_repo,
+        proj_name=proj_name,
+        scan_uploads=scan_uploads,
+    )
+    executor = _create_data_executor()
+    list(executor.map(create_subject, subjects.keys(), subjects.values()))
+
+
+def _create_subject_data_in_repo(
+    subject_label: str,
+    session_labels: ty.List[str],
+    proj_name: str,
+    scan_uploads: ty.List[ty.Tuple[int, str, ty.List[ty.Tuple[str, bytes]]]],
+):
+    """Creates a subject and its sessions in the test XNAT repository, uploading
+    the prebuilt resource zips to each scan of each session"""
+    login = shared_login()
+    xproject = login.projects[proj_name]
+    xclasses = login.classes
+    # Create subject
+    xsubject = xclasses.SubjectData(label=subject_label, parent=xproject)
+    for session_label in session_labels:
+        # Create session
+        xsession = xclasses.MrSessionData(label=session_label, parent=xsubject)
+        for scan_id, scan_type, resource_zips in scan_uploads:
+            # Create scan
+            xscan = xclasses.MrScanData(id=scan_id, type=scan_type, parent=xsession)
+            for resource_name, zip_bytes in resource_zips:
+                # Upload all the files of the resource in a single zip that is
+                # extracted by XNAT
+                xresource = xscan.create_resource(resource_name)
+                xresource.upload(zip_bytes, resource_name + ".zip", extract=True)
+
+
+@lru_cache(maxsize=None)
+def _dummy_resource_zip(filenames: ty.Tuple[str, ...]) -> bytes:
+    """Creates a zip archive containing the dummy files for a resource. Cached so
+    that the archive is created once per test session and shared between all the
+    sessions, and projects (e.g. mutable datasets), created from the blueprints
+
+    Parameters
+    ----------
+    filenames : tuple[str, ...]
+        the names of the files in the resource
+
+    Returns
+    -------
+    bytes
+        the contents of the zip archive
+    """
+    return _zip_in_memory(_dummy_file_contents(fname) for fname in filenames)
+
+
+def _zip_in_memory(files: ty.Iterable[ty.Tuple[str, bytes]]) -> bytes:
+    """Creates a zip archive in memory, so it can be uploaded without writing
+    the files or the archive to disk
+
+    Parameters
+    ----------
+    files : iterable[tuple[str, bytes]]
+        the paths of the files within the archive and their contents
+
+    Returns
+    -------
+    bytes
+        the contents of the zip archive
+    """
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, mode="w") as zfile:
+        for fpath, contents in files:
+            zfile.writestr(fpath, contents)
+    return buf.getvalue()
+
+
+@lru_cache(maxsize=None)
+def _dummy_file_contents(fname: str) -> ty.Tuple[str, bytes]:
+    """Generates a dummy file with `create_test_file` and reads it back into
+    memory, cached so that files with the same name are only generated once per
+    test session
+
+    Parameters
+    ----------
+    fname : str
+        the name of the file to generate
+
+    Returns
+    -------
+    str
+        the path of the generated file relative to the resource
+    bytes
+        the contents of the generated file
+    """
+    with TemporaryDirectory() as tmp_dir:
+        fpath = create_test_file(fname, tmp_dir)
+        return fpath.as_posix(), (Path(tmp_dir) / fpath).read_bytes()
+
+
+def shared_login() -> xnat.XNATSession:
+    """Returns a connection to the test XNAT repository that is shared by all
+    calls from the same thread, avoiding the overhead of opening a new session
+    each time. NB: the session shouldn't be used as a context manager as that
+    would disconnect it on exit, all sessions are disconnected when the
+    interpreter exits
+
+    Returns
+    -------
+    xnat.XNATSession
+        the shared connection
+    """
+    try:
+        login = _thread_logins.login
+    except AttributeError:
+        login = _thread_logins.login = xnat4tests.connect()
+        atexit.register(login.disconnect)
+    else:
+        # Clear listings cached by previous users of the session, which may be
+        # stale
+        login.clearcache()
+    return login
+
+
+@lru_cache(maxsize=1)
+def _create_data_executor() -> ThreadPoolExecutor:
+    # The pool is kept for the whole test session so the worker threads, and
+    # their shared logins, can be reused between datasets
+    return ThreadPoolExecutor(max_workers=CREATE_DATA_MAX_WORKERS)
+
+
+_thread_logins = threading.local()
 
+# Maximum number of subjects to create concurrently in the test XNAT repository
+CREATE_DATA_MAX_WORKERS = 8
 
 # List of intermediatary states can pass through
 # before completing successfully